@@ -0,0 +1,40 @@
+import os
+import sys
+
+# Diretório do aplicativo: é de onde o Streamlit lê .streamlit/secrets.toml e os arquivos estáticos
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+APP_DIR = os.path.join(ROOT_DIR, "user_login_panel")
+
+def use_app_dir():
+    """Executa o benchmark a partir do diretório do aplicativo, como o `streamlit run`."""
+    # Silencia os avisos do Streamlit fora do `streamlit run`
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    os.chdir(APP_DIR)
+
+def percentile(values, pct):
+    """Percentil por interpolação linear de uma lista de amostras."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+def app_test(db_url, **overrides):
+    """Cria um AppTest do main.py com os secrets do aplicativo, apontando o banco para `db_url`."""
+    import toml
+    from streamlit.testing.v1 import AppTest
+
+    secrets = toml.load(os.path.join(APP_DIR, ".streamlit", "secrets.toml"))
+    secrets["USER_DB"]["url"] = db_url
+    # Custo de hash baixo: o benchmark mede o script, não a KDF
+    secrets["PASSWORD_HASH"] = {"algorithm": "pbkdf2-sha256", "i": 1000}
+    secrets.update(overrides)
+
+    at = AppTest.from_file(os.path.join(APP_DIR, "main.py"), default_timeout=60)
+    for key, value in secrets.items():
+        at.secrets[key] = value
+    return at
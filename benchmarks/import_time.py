@@ -0,0 +1,77 @@
+"""Perfil de importação (python -X importtime) do ponto de entrada, para acompanhar o início a frio.
+
+Cada medida roda em um processo novo, depois de importar o Streamlit (custo fixo
+do framework, fora do controle do painel):
+
+  login      módulos que o main.py importa para exibir a tela de login
+  auth       módulos carregados na primeira autenticação (modelos, SQLAlchemy, driver)
+
+Também exibe a tela de login com o substituto do Streamlit dos testes de carga e
+verifica se algum módulo do ORM ou dos drivers foi carregado.
+
+Uso: python -m benchmarks.import_time [--runs 5] [--top 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from benchmarks._support import APP_DIR, ROOT_DIR
+
+MARKER = "--- benchmark ---"
+TARGETS = {
+    "login": ["user_login_panel.controllers.user_controller", "user_login_panel.resources"],
+    "auth": ["user_login_panel.models.user_model", "user_login_panel.models.audit_model"],
+}
+# Módulos que não devem ser carregados para exibir a tela de login
+HEAVY_MODULES = ("sqlalchemy", "psycopg2", "asyncpg", "aiosqlite", "user_login_panel.models.user_model")
+
+RENDER_LOGIN = f"""
+import sys, toml
+from benchmarks import stub_streamlit
+stub_streamlit.install(toml.load(".streamlit/secrets.toml"))
+from user_login_panel.resources import get_user_controller
+from user_login_panel.utils.session_manager import SessionManager
+SessionManager.get_session_id()
+get_user_controller().handle_main_page()
+heavy = {HEAVY_MODULES!r}
+print("carregados=" + ",".join(sorted(name for name in sys.modules if name in heavy or name.split(".")[0] in heavy)))
+"""
+
+def _run(code, importtime=False):
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR, STREAMLIT_LOGGER_LEVEL="error")
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    return subprocess.run(command, cwd=APP_DIR, env=env, capture_output=True, text=True, check=True)
+
+def profile(modules):
+    """Retorna (tempo total em ms, {módulo: tempo próprio em ms}) das importações após o Streamlit."""
+    code = "import streamlit, sys; print(%r, file=sys.stderr); " % MARKER + "; ".join(f"import {module}" for module in modules)
+    stderr = _run(code, importtime=True).stderr
+    self_times = {}
+    for line in stderr.split(MARKER, 1)[1].splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        self_times[name.strip()] = int(own) / 1000
+    return sum(self_times.values()), self_times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Processos por medida (usa a mediana)")
+    parser.add_argument("--top", type=int, default=10, help="Módulos mais lentos exibidos por medida")
+    args = parser.parse_args()
+
+    for name, modules in TARGETS.items():
+        runs = [profile(modules) for _ in range(args.runs)]
+        totals = [total for total, _ in runs]
+        _, self_times = runs[totals.index(sorted(totals)[len(totals) // 2])]
+        print(f"{name:>6}: {statistics.median(totals):8.1f} ms  ({len(self_times)} módulos)")
+        for module, own in sorted(self_times.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"        {own:8.1f} ms  {module}")
+
+    loaded = _run(RENDER_LOGIN).stdout.rsplit("carregados=", 1)[1].strip()
+    print(f"tela de login: {'módulos pesados carregados: ' + loaded if loaded else 'sem ORM nem drivers do banco'}")
+    return 1 if loaded else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""Teste de carga reprodutível do painel, sem Postgres e sem navegador.
+
+Substitui o módulo `streamlit` (benchmarks.stub_streamlit), usa SQLite como banco
+e simula N sessões concorrentes, uma por thread. Cenários:
+
+  session   chamadas do SessionManager de uma execução típica do script
+  login     UserController.handle_login com credenciais válidas
+  register  UserController.handle_register (cadastro de e-mails novos)
+  model     UserModel.check_login direto, sem controlador
+
+Para cada cenário informa p50/p95/p99 da latência, operações/s e memória por
+sessão, e compara com a referência salva em benchmarks/baselines/<cenário>.json.
+Cada medida é a mediana de --repeat execuções, após --warmup execuções
+descartadas; as execuções dos cenários se alternam, para que uma oscilação da
+máquina afete todos eles e não um só. A memória vem de uma execução à parte
+com tracemalloc, que não distorce as latências. As referências dependem da
+máquina: gere-as novamente (--save-baseline) ao trocar de ambiente e nos
+commits que mudam o desempenho de propósito, com a máquina ociosa.
+
+Com --async-db, o modelo é o AsyncUserModel (aiosqlite) atrás da fachada síncrona
+BridgedUserModel, como com a seção DB_ASYNC habilitada.
+
+Uso: python -m benchmarks.load_test [--scenarios login,session] [--sessions 16] [--iterations 50] [--repeat 7] [--async-db]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import toml
+import tracemalloc
+from threading import Barrier, Thread
+from benchmarks import stub_streamlit
+from benchmarks._support import APP_DIR, percentile, use_app_dir
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+SCENARIOS = ("session", "login", "register", "model")
+# Multiplicador de --iterations por cenário: uma execução do session com 50 operações dura
+# poucos milissegundos, e as operações/s ficariam à mercê do agendador
+ITERATION_SCALE = {"session": 10}
+
+def load_app(db_url, hash_iterations):
+    """Instala o substituto do Streamlit e importa o aplicativo apontando para `db_url`."""
+    use_app_dir()
+    secrets = toml.load(os.path.join(APP_DIR, ".streamlit", "secrets.toml"))
+    secrets["USER_DB"]["url"] = db_url
+    secrets["PASSWORD_HASH"] = {"algorithm": "pbkdf2-sha256", "i": hash_iterations}
+    # Cada sessão repete o login muitas vezes: o limitador não deve interferir na medida
+    secrets["RATE_LIMIT"] = {"capacity": 1_000_000, "refill_rate": 1_000_000}
+    stub_streamlit.install(secrets)
+
+    from user_login_panel.controllers.user_controller import UserController
+    from user_login_panel.models.user_model import UserModel
+    from user_login_panel.resources import get_rate_limiter
+    from user_login_panel.utils.session_manager import SessionManager
+    return UserController, UserModel, SessionManager, get_rate_limiter
+
+def user_row(i):
+    return {
+        "email": f"carga{i}@example.com",
+        "name": f"Usuário {i}",
+        "enterprise": "Empresa",
+        "position": "Cargo",
+        "permission": "vendas",
+        "exception": "",
+        "autorization": "12345678",
+        "password": "senha",
+    }
+
+def register_inputs(email):
+    return {
+        "_register_user": email,
+        "_username": "Novo",
+        "_user_enterprise": "Empresa",
+        "_user_position": "Cargo",
+        "_user_permission": "vendas",
+        "_user_exception": "",
+        "_register_code": "12345678",
+        "_register_pass": "senha",
+        "_confirm_pass": "senha",
+    }
+
+class LoadTest:
+    def __init__(self, app, model, sessions, iterations):
+        self.UserController, _, self.SessionManager, self.get_rate_limiter = app
+        self.model = model
+        self.sessions = sessions
+        self.iterations = iterations
+
+    def _controller(self):
+        return self.UserController(model=self.model, rate_limiter=self.get_rate_limiter())
+
+    def op_session(self, worker, i):
+        # Uma execução do script consulta o id e o estado da sessão dezenas de vezes
+        SessionManager = self.SessionManager
+        for _ in range(20):
+            SessionManager.get_session_id()
+        SessionManager.get_session_state("logged_in", False)
+        SessionManager.get_session_state("current_page", "login")
+        SessionManager.set_session_state("current_page", "login")
+
+    def op_login(self, worker, i, controller):
+        stub_streamlit.set_inputs(
+            {"_login_user": f"carga{worker}@example.com", "_login_pass": "senha"},
+            clicks=["Login"]
+        )
+        try:
+            controller.handle_login()
+        except stub_streamlit.RerunException:
+            pass
+        assert self.SessionManager.get_session_state("logged_in"), stub_streamlit.browser().messages
+
+    def op_register(self, worker, i, controller):
+        stub_streamlit.set_inputs(register_inputs(f"novo{worker}-{i}-{time.time_ns()}@example.com"), clicks=["_register_button"])
+        controller.handle_register()
+        assert ("success", "Usuário cadastrado com sucesso!") in stub_streamlit.browser().messages
+
+    def op_model(self, worker, i):
+        assert self.model.check_login(f"carga{worker}@example.com", "senha")
+
+    def _worker(self, scenario, worker, barrier, latencies, errors):
+        stub_streamlit.reset_browser()
+        controller = self._controller() if scenario in ("login", "register") else None
+        op = getattr(self, f"op_{scenario}")
+        args = (controller,) if controller is not None else ()
+        barrier.wait()
+        for i in range(self.iterations * ITERATION_SCALE.get(scenario, 1)):
+            start = time.perf_counter()
+            try:
+                op(worker, i, *args)
+            except Exception as error:
+                # Operação que falha não entra nas latências, mas reprova a execução
+                errors.append(error)
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    def run(self, scenario, traced=False):
+        """Uma execução do cenário com todas as sessões; com `traced`, mede também o pico de memória."""
+        latencies, errors = [], []
+        barrier = Barrier(self.sessions + 1)
+        threads = [
+            Thread(target=self._worker, args=(scenario, w, barrier, latencies, errors)) for w in range(self.sessions)
+        ]
+
+        gc.collect()
+        if traced:
+            tracemalloc.start()
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        peak = 0
+        if traced:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        return {
+            "operations": len(latencies),
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "mean_ms": statistics.mean(latencies) * 1000,
+            "ops_per_sec": len(latencies) / elapsed,
+            "memory_per_session_kib": peak / self.sessions / 1024,
+            "errors": len(errors),
+        }
+
+    def measure(self, scenarios, repeat, warmup):
+        """Mediana, por cenário, de `repeat` rodadas alternadas, após `warmup` rodadas descartadas."""
+        runs = {scenario: [] for scenario in scenarios}
+        for round_number in range(warmup + repeat):
+            for scenario in scenarios:
+                result = self.run(scenario)
+                if round_number >= warmup:
+                    runs[scenario].append(result)
+
+        results = {}
+        for scenario, scenario_runs in runs.items():
+            results[scenario] = {key: statistics.median(run[key] for run in scenario_runs) for key in scenario_runs[0]}
+            traced = self.run(scenario, traced=True)
+            results[scenario]["memory_per_session_kib"] = traced["memory_per_session_kib"]
+            # Erros somados em todas as execuções: qualquer falha aparece
+            results[scenario]["errors"] = sum(run["errors"] for run in scenario_runs) + traced["errors"]
+        return results
+
+def compare(scenario, result, tolerance):
+    """Compara com a referência salva; retorna a lista de regressões."""
+    path = os.path.join(BASELINE_DIR, f"{scenario}.json")
+    if not os.path.exists(path):
+        return []
+    with open(path) as stream:
+        baseline = json.load(stream)["result"]
+
+    regressions = []
+    # O p99 com poucas operações é ruidoso demais para reprovar a execução: apenas informado
+    for key, higher_is_better, gated in (
+        ("p50_ms", False, True), ("p95_ms", False, True), ("p99_ms", False, False), ("ops_per_sec", True, True)
+    ):
+        before, after = baseline[key], result[key]
+        if not before:
+            continue
+        change = (after - before) / before
+        worse = -change if higher_is_better else change
+        print(f"    {key:>22}: {before:10.3f} -> {after:10.3f} ({change:+.0%})")
+        if gated and worse > tolerance:
+            regressions.append(f"{scenario}.{key} {change:+.0%}")
+    return regressions
+
+def save_baseline(scenario, result, args):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(os.path.join(BASELINE_DIR, f"{scenario}.json"), "w") as stream:
+        json.dump({
+            "scenario": scenario,
+            "sessions": args.sessions,
+            "iterations": args.iterations,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "result": {key: round(value, 4) for key, value in result.items()},
+        }, stream, indent=2)
+        stream.write("\n")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--sessions", type=int, default=16, help="Sessões concorrentes (threads)")
+    parser.add_argument("--iterations", type=int, default=50, help="Operações por sessão")
+    parser.add_argument("--repeat", type=int, default=7, help="Execuções medidas por cenário (vale a mediana)")
+    parser.add_argument("--warmup", type=int, default=1, help="Execuções descartadas antes da medida")
+    parser.add_argument("--hash-iterations", type=int, default=1000, help="Iterações do PBKDF2 (custo do hash)")
+    parser.add_argument("--async-db", action="store_true", help="Usa o modelo assíncrono (aiosqlite) com a fachada síncrona")
+    parser.add_argument("--save-baseline", action="store_true", help="Grava o resultado como nova referência")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Piora máxima aceita em relação à referência")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Cenários desconhecidos: {', '.join(sorted(unknown))}")
+
+    regressions = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Espera longa pelo lock de escrita do SQLite: no cenário register as 16 sessões gravam ao mesmo tempo
+        app = load_app(f"sqlite:///{os.path.join(tmp, 'carga.db')}?timeout=30", args.hash_iterations)
+        model = app[1]()
+        model.register_users((user_row(i) for i in range(args.sessions)), chunk_size=500)
+        if args.async_db:
+            from user_login_panel.models.async_user_model import AsyncUserModel, BridgedUserModel
+            model = BridgedUserModel(AsyncUserModel(model.db_url, model.subject))
+        load_test = LoadTest(app, model, args.sessions, args.iterations)
+
+        results = load_test.measure(scenarios, args.repeat, args.warmup)
+        for scenario, result in results.items():
+            print(
+                f"{scenario:>9}: p50 {result['p50_ms']:8.3f} ms  p95 {result['p95_ms']:8.3f} ms"
+                f"  p99 {result['p99_ms']:8.3f} ms  {result['ops_per_sec']:10.1f} ops/s"
+                f"  {result['memory_per_session_kib']:8.1f} KiB/sessão"
+            )
+            # Referências separadas para o modelo assíncrono
+            baseline = f"{scenario}-async" if args.async_db else scenario
+            if result["errors"]:
+                # Execução com falhas não serve de referência nem passa na comparação
+                print(f"    {result['errors']} operações falharam")
+                regressions.append(f"{baseline}.errors {result['errors']}")
+            elif args.save_baseline:
+                save_baseline(baseline, result, args)
+            else:
+                regressions.extend(compare(baseline, result, args.tolerance))
+
+        if not args.async_db:
+            model.engine.dispose()
+
+    if regressions:
+        print("Regressões: " + ", ".join(regressions))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
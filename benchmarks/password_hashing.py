@@ -0,0 +1,46 @@
+"""Vazão de verificações de senha (logins/s) do PasswordHasher conforme o número de workers.
+
+Uso: python -m benchmarks.password_hashing [--logins 200] [--algorithm scrypt]
+"""
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks._support import use_app_dir
+
+use_app_dir()
+
+from user_login_panel.models.password_hasher import PasswordHasher
+
+def measure(hasher, stored, logins, concurrency):
+    # Pool novo com o número de workers desejado
+    PasswordHasher._executor = None
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as sessions:
+        results = list(sessions.map(lambda _: hasher.verify("senha", stored), range(logins)))
+    elapsed = time.perf_counter() - start
+    PasswordHasher._executor.shutdown()
+    assert all(results)
+    return logins / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--algorithm", default="scrypt", choices=sorted(PasswordHasher.DEFAULTS))
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({w for w in (1, 2, 4, 8, 16) if w <= cores} | {cores})
+    legacy = PasswordHasher(args.algorithm, workers=1)
+    legacy_stored = hashlib.sha256(b"senha").hexdigest()
+    print(f"{'legado SHA-256':>16}: {measure(legacy, legacy_stored, args.logins * 10, 1):10.1f} logins/s")
+
+    for workers in worker_counts:
+        hasher = PasswordHasher(args.algorithm, workers=workers)
+        stored = hasher._hash_sync("senha")
+        rate = measure(hasher, stored, args.logins, workers * 2)
+        print(f"{args.algorithm + f' x{workers}':>16}: {rate:10.1f} logins/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compara a verificação de acesso reinterpretando os textos a cada checagem com o PermissionSet compilado.
+
+Simula execuções do script em que o painel decide, para cada recurso de um
+catálogo, se o usuário pode vê-lo.
+
+Uso: python -m benchmarks.permission_check [--reruns 2000] [--resources 50]
+"""
+import argparse
+import time
+import uuid
+from benchmarks import stub_streamlit
+
+PERMISSION = "vendas, financeiro.relatorios; rh/folha, marketing.campanhas, operacoes"
+EXCEPTION = "vendas.comissoes, financeiro.relatorios.diretoria"
+
+def catalogue(size):
+    areas = ("vendas", "financeiro", "rh", "marketing", "operacoes", "juridico")
+    reports = ("relatorios", "comissoes", "metas", "folha", "campanhas")
+    return [f"{areas[i % len(areas)]}.{reports[i // len(areas) % len(reports)]}.item{i}" for i in range(size)]
+
+def naive_is_allowed(permission, exception, resource):
+    """Como os painéis faziam: separa e compara os textos a cada checagem."""
+    resource = resource.lower()
+    def matches(text):
+        for item in text.replace(";", ",").split(","):
+            item = item.strip().lower().replace("/", ".").rstrip(".*")
+            if item and (resource == item or resource.startswith(item + ".")):
+                return True
+        return False
+    return matches(permission) and not matches(exception)
+
+def run_naive(resources, reruns):
+    allowed = 0
+    for _ in range(reruns):
+        for resource in resources:
+            allowed += naive_is_allowed(PERMISSION, EXCEPTION, resource)
+    return allowed
+
+def run_compiled(resources, reruns):
+    from user_login_panel.utils.session_manager import SessionManager
+    allowed = 0
+    for _ in range(reruns):
+        # Uma busca das permissões compiladas por execução do script
+        access = SessionManager.get_permissions()
+        for resource in resources:
+            allowed += access.is_allowed(resource)
+    return allowed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=2000)
+    parser.add_argument("--resources", type=int, default=50)
+    args = parser.parse_args()
+
+    # Sessão logada fora do `streamlit run`, com o substituto do Streamlit dos testes de carga
+    st = stub_streamlit.install({})
+    from user_login_panel.utils.session_manager import SessionManager
+
+    st.session_state["session_id"] = str(uuid.uuid4())
+    SessionManager.update_session_state({"logged_in": True, "permission": PERMISSION, "exception": EXCEPTION})
+
+    resources = catalogue(args.resources)
+    checks = args.reruns * len(resources)
+    results = []
+    for name, runner in (("texto a cada checagem", run_naive), ("PermissionSet", run_compiled)):
+        start = time.perf_counter()
+        allowed = runner(resources, args.reruns)
+        elapsed = time.perf_counter() - start
+        results.append(allowed)
+        print(f"{name:>22}: {elapsed * 1e9 / checks:8.0f} ns/checagem  {elapsed * 1000 / args.reruns:7.3f} ms/execução")
+
+    assert results[0] == results[1], "As duas implementações devem concordar"
+
+if __name__ == "__main__":
+    main()
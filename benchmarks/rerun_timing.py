@@ -0,0 +1,111 @@
+"""Tempo de script por interação no Streamlit, com e sem a camada de recursos em cache.
+
+"Sem cache" limpa st.cache_resource/st.cache_data, o controlador da sessão e o
+registro de engines antes de cada execução, reproduzindo a reconstrução completa
+de antes. Usa o AppTest do Streamlit e SQLite, sem navegador nem Postgres.
+
+Também mede interações (troca de data na barra lateral, digitação nos formulários
+de login e de cadastro): o script completo, que é o que cada interação custava
+antes dos fragmentos, contra o corpo do fragmento (histogramas fragment_*), que é
+o que a reexecução parcial executa. O AppTest sempre roda o script inteiro, por
+isso o tempo do fragmento vem das métricas.
+
+Uso: python -m benchmarks.rerun_timing [--reruns 30]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from benchmarks._support import app_test, percentile, use_app_dir
+
+use_app_dir()
+
+import streamlit as st
+from user_login_panel.config.database import DatabaseRegistry
+
+def reset_resources(at):
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    DatabaseRegistry.dispose()
+    if "_user_controller" in at.session_state:
+        del at.session_state["_user_controller"]
+
+def measure(db_url, reruns, cached):
+    at = app_test(db_url)
+    at.run()
+    samples = []
+    for _ in range(reruns):
+        if not cached:
+            reset_resources(at)
+        start = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - start)
+    assert not at.exception, at.exception
+    return samples
+
+def timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    assert not at.exception, at.exception
+    return time.perf_counter() - start
+
+def measure_interactions(db_url, reruns):
+    """Tempo do script completo em cada interação, por região da página."""
+    from user_login_panel.models.user_model import UserModel
+    UserModel(db_url).register_users([{
+        "email": "bench@ex.com", "name": "Bench", "enterprise": "E", "position": "P",
+        "permission": "admin", "exception": "", "autorization": "1", "password": "senha"
+    }])
+
+    samples = {"date_range": [], "login": [], "register": []}
+
+    at = app_test(db_url)
+    at.run()
+    for i in range(reruns):
+        at.text_input[0].input(f"user{i}@ex.com")
+        samples["login"].append(timed_run(at))
+        at.text_input[2].input(f"new{i}@ex.com")
+        samples["register"].append(timed_run(at))
+
+    at.text_input[0].input("bench@ex.com")
+    at.text_input[1].input("senha")
+    at.button[0].click().run()
+    for i in range(reruns):
+        at.sidebar.date_input[0].set_value(date.today() - timedelta(days=i % 30 + 1))
+        samples["date_range"].append(timed_run(at))
+
+    return samples
+
+def ms(samples):
+    return f"p50 {percentile(samples, 50) * 1000:7.2f} ms  p95 {percentile(samples, 95) * 1000:7.2f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        for label, cached in (("sem cache", False), ("com cache", True)):
+            samples = measure(db_url, args.reruns, cached)
+            print(
+                f"{label:>10}: média {statistics.mean(samples) * 1000:7.2f} ms"
+                f"  {ms(samples)}"
+            )
+
+        from user_login_panel.utils.metrics import Metrics
+        Metrics.reset()
+        interactions = measure_interactions(db_url, args.reruns)
+        histograms = Metrics.snapshot()["histograms"]
+        for region, samples in interactions.items():
+            print(f"{region:>10}: script completo {ms(samples)}  média {statistics.mean(samples) * 1000:7.2f} ms")
+            fragment = histograms.get(f"fragment_{region}_seconds")
+            if fragment:
+                # Média exata (os percentis do histograma são limitados pelos baldes)
+                print(f"{'':>10}  fragmento       média {fragment['sum'] / fragment['count'] * 1000:7.2f} ms")
+        DatabaseRegistry.dispose()
+
+if __name__ == "__main__":
+    main()
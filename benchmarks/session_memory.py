@@ -0,0 +1,63 @@
+"""Compara a memória por sessão do estado antigo (dicionários espalhados) com o SessionRecord.
+
+Uso: python -m benchmarks.session_memory [--sessions 100000]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+from user_login_panel.utils.session_store import ShardedSessionStore
+
+def _logged_in_values(i):
+    return {
+        "logged_in": True,
+        "current_page": "protected",
+        "user": f"Usuário {i}",
+        "permission": "vendas,financeiro",
+        "exception": "",
+    }
+
+def build_legacy(session_ids):
+    """Layout anterior: _sessions, _last_access, _permissions, _exceptions e _users."""
+    sessions, last_access, permissions, exceptions, users = {}, {}, {}, {}, {}
+    now = time.time()
+    for i, session_id in enumerate(session_ids):
+        values = _logged_in_values(i)
+        sessions[session_id] = {"logged_in": values["logged_in"], "current_page": values["current_page"]}
+        last_access[session_id] = now
+        permissions[session_id] = values["permission"]
+        exceptions[session_id] = values["exception"]
+        users[session_id] = values["user"]
+    return sessions, last_access, permissions, exceptions, users
+
+def build_records(session_ids):
+    """Layout atual: um SessionRecord por sessão no armazenamento particionado."""
+    store = ShardedSessionStore(3600)
+    now = time.time()
+    for i, session_id in enumerate(session_ids):
+        store.update(session_id, _logged_in_values(i), now)
+    return store
+
+def measure(builder, session_ids):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = builder(session_ids)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    session_ids = [str(uuid.uuid4()) for _ in range(args.sessions)]
+    for name, builder in (("legado (dicionários)", build_legacy), ("SessionRecord", build_records)):
+        total = measure(builder, session_ids)
+        print(f"{name:>22}: {total / 1024 / 1024:8.1f} MiB  {total / args.sessions:7.0f} bytes/sessão")
+
+if __name__ == "__main__":
+    main()
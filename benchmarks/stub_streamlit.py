@@ -0,0 +1,152 @@
+"""Substituto mínimo do módulo `streamlit` para os testes de carga.
+
+Cada thread representa uma aba de navegador: `session_state`, `query_params`,
+entradas de texto e cliques ficam em armazenamento local da thread. Deve ser
+instalado (install()) antes de importar qualquer módulo de user_login_panel.
+"""
+import functools
+import sys
+import types
+import uuid
+from contextlib import nullcontext
+from datetime import date
+from threading import local
+
+class RerunException(Exception):
+    """Lançada por st.rerun(), assim como o Streamlit interrompe o script."""
+
+class AttrDict(dict):
+    """Dicionário com acesso por atributo, como o st.secrets."""
+
+    def __getattr__(self, name):
+        try:
+            value = self[name]
+        except KeyError:
+            raise AttributeError(name)
+        return AttrDict(value) if isinstance(value, dict) and not isinstance(value, AttrDict) else value
+
+class SessionState(dict):
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+_tab = local()
+
+def browser():
+    """Estado da aba simulada pela thread atual."""
+    if not hasattr(_tab, "session_state"):
+        reset_browser()
+    return _tab
+
+def reset_browser():
+    # Contexto da execução do script: cada aba é uma sessão do Streamlit
+    _tab.ctx = types.SimpleNamespace(session_id=str(uuid.uuid4()))
+    _tab.session_state = SessionState()
+    _tab.query_params = {}
+    _tab.inputs = {}
+    _tab.clicks = set()
+    _tab.messages = []
+
+def set_inputs(inputs, clicks=()):
+    """Define os valores digitados (por sufixo da chave) e os botões clicados na próxima execução."""
+    tab = browser()
+    tab.inputs = dict(inputs)
+    tab.clicks = set(clicks)
+    tab.messages = []
+
+def _lookup(label, key):
+    tab = browser()
+    for suffix, value in tab.inputs.items():
+        if (key and key.endswith(suffix)) or label == suffix:
+            return value
+    return None
+
+def _text_input(label, key=None, type=None, **kwargs):
+    value = _lookup(label, key)
+    return "" if value is None else value
+
+def _button(label, key=None, **kwargs):
+    tab = browser()
+    return label in tab.clicks or any(key and key.endswith(suffix) for suffix in tab.clicks)
+
+def _message(level):
+    def show(message, *args, **kwargs):
+        browser().messages.append((level, message))
+    return show
+
+def _noop(*args, **kwargs):
+    return None
+
+def _rerun(*args, **kwargs):
+    raise RerunException()
+
+def _cache(func=None, **kwargs):
+    if func is None:
+        return _cache
+    cached = functools.lru_cache(maxsize=None)(func)
+    cached.clear = lambda *args, **kwargs: cached.cache_clear()
+    return cached
+
+_cache.clear = _noop
+
+def install(secrets):
+    """Registra o substituto em sys.modules['streamlit'] com os secrets informados."""
+    module = types.ModuleType("streamlit")
+    module.secrets = AttrDict(secrets)
+    module.RerunException = RerunException
+
+    module.text_input = _text_input
+    module.button = _button
+    module.checkbox = lambda *args, **kwargs: False
+    module.date_input = lambda label, value=None, **kwargs: date.today()
+    module.columns = lambda spec, **kwargs: [nullcontext() for _ in range(spec if isinstance(spec, int) else len(spec))]
+    module.tabs = lambda labels: [nullcontext() for _ in labels]
+    module.expander = lambda *args, **kwargs: nullcontext()
+    module.rerun = _rerun
+    module.cache_resource = _cache
+    module.cache_data = _cache
+    module.fragment = lambda func=None, **kwargs: func if func is not None else (lambda f: f)
+
+    for name in ("success", "warning", "error", "info"):
+        setattr(module, name, _message(name))
+    for name in ("set_page_config", "image", "title", "subheader", "write", "dataframe", "code", "markdown"):
+        setattr(module, name, _noop)
+
+    module.sidebar = _Sidebar(module)
+
+    class _Module(types.ModuleType):
+        session_state = property(lambda self: browser().session_state)
+        query_params = property(lambda self: browser().query_params)
+
+    module.__class__ = _Module
+    sys.modules["streamlit"] = module
+
+    # streamlit.runtime.scriptrunner.get_script_run_ctx: contexto da aba simulada pela thread
+    runtime = types.ModuleType("streamlit.runtime")
+    scriptrunner = types.ModuleType("streamlit.runtime.scriptrunner")
+    scriptrunner.get_script_run_ctx = lambda suppress_warning=False: browser().ctx
+    runtime.scriptrunner = scriptrunner
+    module.runtime = runtime
+    sys.modules["streamlit.runtime"] = runtime
+    sys.modules["streamlit.runtime.scriptrunner"] = scriptrunner
+    return module
+
+class _Sidebar:
+    """Barra lateral: um contexto que repassa os widgets ao módulo."""
+
+    def __init__(self, module):
+        self._module = module
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
@@ -0,0 +1,126 @@
+"""Mede idas ao banco e latência dos caminhos de escrita do UserModel (antes x depois).
+
+"Antes" reproduz as versões com SELECT seguido de INSERT/alteração pelo ORM;
+"depois" usa os métodos atuais do UserModel (INSERT ... ON CONFLICT / UPDATE e
+DELETE ... RETURNING). Roda sobre SQLite, sem Postgres.
+
+Uso: python -m benchmarks.write_paths [--users 500]
+"""
+import argparse
+import os
+import tempfile
+import time
+from benchmarks._support import use_app_dir
+
+use_app_dir()
+
+from sqlalchemy import event
+from user_login_panel.models.password_hasher import PasswordHasher
+from user_login_panel.models.user_model import UserModel, UserModelBase
+
+# Custo de hash baixo (como no load_test): o benchmark mede as idas ao banco, não a KDF
+UserModelBase._hasher = PasswordHasher("pbkdf2-sha256", i=1000)
+
+class RoundTripCounter:
+    """Conta instruções e commits enviados ao banco pela engine."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def _on_commit(self, *args):
+        self.count += 1
+
+def legacy_register(model, data):
+    session = model.Session()
+    try:
+        if session.query(model.User).filter_by(email=data["new_email"]).first():
+            return False
+        session.add(model.User(
+            email=data["new_email"], name=data["new_name"], enterprise=data["new_enterprise"],
+            position=data["new_position"], permission=data["new_permission"],
+            exception=data["new_exception"], autorization=data["autorization_code"],
+            password=model.hash_password(data["new_password"])
+        ))
+        session.commit()
+        return True
+    finally:
+        session.close()
+
+def legacy_update(model, email, data):
+    session = model.Session()
+    try:
+        user = session.query(model.User).filter_by(email=email).first()
+        if user:
+            user.name = data.get("new_name", user.name)
+            user.password = model.hash_password(data["new_password"])
+            session.commit()
+            return True
+        return False
+    finally:
+        session.close()
+
+def legacy_delete(model, email):
+    session = model.Session()
+    try:
+        user = session.query(model.User).filter_by(email=email).first()
+        if user:
+            session.delete(user)
+            session.commit()
+            return True
+        return False
+    finally:
+        session.close()
+
+def user_data(i, prefix):
+    return {
+        "new_email": f"{prefix}{i}@example.com",
+        "new_name": f"Usuário {i}",
+        "new_enterprise": "Empresa",
+        "new_position": "Cargo",
+        "new_permission": "vendas",
+        "new_exception": "",
+        "autorization_code": "12345678",
+        "new_password": "senha",
+    }
+
+def changed_data(i, prefix):
+    data = user_data(i, prefix)
+    data["new_name"] = f"Alterado {i}"
+    return data
+
+def run(label, model, counter, users, register, update, delete):
+    for op_name, op in (("register", register), ("update", update), ("delete", delete)):
+        counter.count = 0
+        start = time.perf_counter()
+        for i in range(users):
+            op(i)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>7} {op_name:>8}: {counter.count / users:5.2f} idas/op  {elapsed / users * 1e6:8.1f} µs/op")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = UserModel(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        counter = RoundTripCounter(model.engine)
+
+        run("antes", model, counter, args.users,
+            lambda i: legacy_register(model, user_data(i, "a")),
+            lambda i: legacy_update(model, f"a{i}@example.com", changed_data(i, "a")),
+            lambda i: legacy_delete(model, f"a{i}@example.com"))
+        run("depois", model, counter, args.users,
+            lambda i: model.register_user(user_data(i, "b")),
+            lambda i: model.update_user(f"b{i}@example.com", changed_data(i, "b")),
+            lambda i: model.delete_user(f"b{i}@example.com"))
+
+        model.engine.dispose()
+
+if __name__ == "__main__":
+    main()
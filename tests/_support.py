@@ -0,0 +1,15 @@
+import os
+from benchmarks._support import use_app_dir
+from user_login_panel.models.password_hasher import PasswordHasher
+from user_login_panel.models.user_model import UserModelBase
+
+def use_app_models():
+    """Prepara os testes que criam UserModel: secrets do aplicativo e hash de custo baixo."""
+    previous_dir, previous_hasher = os.getcwd(), UserModelBase._hasher
+    use_app_dir()
+    UserModelBase._hasher = PasswordHasher("pbkdf2-sha256", i=10)
+
+    def restore():
+        os.chdir(previous_dir)
+        UserModelBase._hasher = previous_hasher
+    return restore
@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import unittest
+from user_login_panel.models.password_hasher import PasswordHasher
+
+# Custos baixos: os testes verificam o comportamento, não a KDF
+FAST_SCRYPT = {"n": 2 ** 4, "r": 1, "p": 1}
+FAST_PBKDF2 = {"i": 10}
+
+class PasswordHasherTest(unittest.TestCase):
+    def setUp(self):
+        self.hasher = PasswordHasher("scrypt", **FAST_SCRYPT)
+
+    def test_hash_formats(self):
+        scrypt = self.hasher.hash("senha")
+        pbkdf2 = PasswordHasher("pbkdf2-sha256", **FAST_PBKDF2).hash("senha")
+
+        self.assertRegex(scrypt, r"^\$scrypt\$n=16,r=1,p=1\$[A-Za-z0-9+/]+\$[A-Za-z0-9+/]+$")
+        self.assertRegex(pbkdf2, r"^\$pbkdf2-sha256\$i=10\$[A-Za-z0-9+/]+\$[A-Za-z0-9+/]+$")
+
+    def test_hash_many(self):
+        passwords = [f"senha{i}" for i in range(5)]
+        hashes = self.hasher.hash_many(iter(passwords))
+
+        self.assertEqual(len(set(hashes)), 5)
+        for password, stored in zip(passwords, hashes):
+            self.assertTrue(self.hasher.verify(password, stored))
+
+    def test_hash_is_salted(self):
+        self.assertNotEqual(self.hasher.hash("senha"), self.hasher.hash("senha"))
+
+    def test_verify(self):
+        stored = self.hasher.hash("senha")
+
+        self.assertTrue(self.hasher.verify("senha", stored))
+        self.assertFalse(self.hasher.verify("outra", stored))
+        self.assertFalse(self.hasher.verify("senha", None))
+
+    def test_verify_other_algorithm(self):
+        # Hash gravado com outra versão continua válido até ser regravado
+        stored = PasswordHasher("pbkdf2-sha256", **FAST_PBKDF2).hash("senha")
+
+        self.assertTrue(self.hasher.verify("senha", stored))
+        self.assertTrue(self.hasher.needs_rehash(stored))
+
+    def test_legacy_sha256(self):
+        stored = hashlib.sha256("senha".encode()).hexdigest()
+
+        self.assertTrue(PasswordHasher.is_legacy(stored))
+        self.assertTrue(self.hasher.verify("senha", stored))
+        self.assertFalse(self.hasher.verify("outra", stored))
+        self.assertTrue(self.hasher.needs_rehash(stored))
+
+    def test_needs_rehash_on_cost_change(self):
+        stored = self.hasher.hash("senha")
+
+        self.assertFalse(self.hasher.needs_rehash(stored))
+        self.assertTrue(PasswordHasher("scrypt", n=2 ** 5, r=1, p=1).needs_rehash(stored))
+
+    def test_malformed_stored_values(self):
+        valid = self.hasher.hash("senha")
+        malformed = [
+            "",
+            "$",
+            "$scrypt$n=16",
+            "$scrypt$n$c2Fs$aGFzaA",
+            "$scrypt$n=abc,r=1,p=1$c2Fs$aGFzaA",
+            "$scrypt$n=16,r=1$c2Fs$aGFzaA",
+            "$scrypt$n=3,r=1,p=1$c2Fs$aGFzaA",
+            "$md5$i=1$c2Fs$aGFzaA",
+            "$scrypt$n=16,r=1,p=1$c2Fs$***",
+            "não-hexadecimal",
+            valid[:-4],
+        ]
+        for stored in malformed:
+            with self.subTest(stored=stored):
+                self.assertFalse(self.hasher.verify("senha", stored))
+                self.assertTrue(self.hasher.needs_rehash(stored))
+
+    def test_from_settings(self):
+        hasher = PasswordHasher.from_settings({"algorithm": "pbkdf2-sha256", "i": "20", "workers": "2"})
+
+        self.assertEqual(hasher.algorithm, "pbkdf2-sha256")
+        self.assertEqual(hasher.params, {"i": 20})
+        self.assertEqual(hasher.workers, 2)
+        with self.assertRaises(ValueError):
+            PasswordHasher.from_settings({"algorithm": "md5"})
+
+    def test_async(self):
+        async def run():
+            stored = await self.hasher.hash_async("senha")
+            return (
+                await self.hasher.verify_async("senha", stored),
+                await self.hasher.verify_async("outra", stored),
+                await self.hasher.verify_async("senha", None),
+            )
+
+        self.assertEqual(asyncio.run(run()), (True, False, False))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import os
+import tempfile
+import time
+import unittest
+from threading import Thread
+from user_login_panel.utils.rate_limiter import LoginRateLimiter, LRUStateStore, SessionStoreStateStore
+from user_login_panel.utils.session_store import ShardedSessionStore
+from user_login_panel.utils.sqlite_session_store import SQLiteSessionStore
+
+KEYS = LoginRateLimiter.keys("Ana@Example.com ", "sessao-1")
+
+class LoginRateLimiterTest(unittest.TestCase):
+    def limiter(self, store=None, **settings):
+        params = {"capacity": 5, "refill_rate": 1.0, "free_failures": 2, "base_delay": 1.0, "max_delay": 8.0}
+        params.update(settings)
+        return LoginRateLimiter(store=store, **params)
+
+    def test_keys_normalize_email(self):
+        self.assertEqual(KEYS, ["email:ana@example.com", "session:sessao-1"])
+
+    def test_token_bucket_burst_and_refill(self):
+        limiter = self.limiter()
+
+        for _ in range(5):
+            self.assertEqual(limiter.check(KEYS, now=100.0), 0.0)
+        self.assertAlmostEqual(limiter.check(KEYS, now=100.0), 1.0)
+        # Um segundo depois há uma nova tentativa disponível
+        self.assertEqual(limiter.check(KEYS, now=101.0), 0.0)
+        self.assertGreater(limiter.check(KEYS, now=101.0), 0.0)
+        self.assertEqual(limiter.stats()["allowed"], 6)
+        self.assertEqual(limiter.stats()["rejected"], 2)
+
+    def test_progressive_backoff(self):
+        limiter = self.limiter(capacity=100)
+        now = 100.0
+
+        # Antes de free_failures falhas: sem bloqueio
+        limiter.record_failure(KEYS, now=now)
+        self.assertEqual(limiter.check(KEYS, now=now), 0.0)
+
+        # A partir de free_failures o bloqueio dobra a cada falha, até max_delay
+        for expected in (1.0, 2.0, 4.0, 8.0, 8.0):
+            limiter.record_failure(KEYS, now=now)
+            self.assertAlmostEqual(limiter.check(KEYS, now=now), expected)
+        self.assertEqual(limiter.check(KEYS, now=now + 8.0), 0.0)
+
+    def test_backoff_exponent_is_capped(self):
+        limiter = self.limiter(capacity=100, max_delay=300.0)
+
+        # 2 ** excess estouraria o float por volta da milésima falha
+        for _ in range(2000):
+            limiter.record_failure(KEYS, now=100.0)
+        self.assertAlmostEqual(limiter.check(KEYS, now=100.0), 300.0)
+
+    def test_failures_outlive_the_longest_block(self):
+        limiter = self.limiter(capacity=100)
+        self.assertEqual(limiter.failure_window, 16.0)
+        self.assertGreaterEqual(limiter._ttl(), 2 * limiter.max_delay)
+
+        for _ in range(6):
+            limiter.record_failure(KEYS, now=100.0)
+        # Vencido o bloqueio máximo, a próxima falha volta a bloquear por max_delay
+        self.assertEqual(limiter.check(KEYS, now=108.0), 0.0)
+        limiter.record_failure(KEYS, now=108.0)
+        self.assertAlmostEqual(limiter.check(KEYS, now=108.0), 8.0)
+
+    def test_failure_window_setting(self):
+        limiter = LoginRateLimiter.from_settings({"max_delay": 10, "failure_window": 3600})
+        self.assertEqual(limiter.failure_window, 3600.0)
+        self.assertEqual(LoginRateLimiter.from_settings({"max_delay": 10}).failure_window, 20.0)
+
+    def test_success_resets_failures(self):
+        limiter = self.limiter(capacity=100)
+
+        for _ in range(4):
+            limiter.record_failure(KEYS, now=100.0)
+        self.assertGreater(limiter.check(KEYS, now=100.0), 0.0)
+
+        limiter.record_success(KEYS, now=100.0)
+        self.assertEqual(limiter.check(KEYS, now=100.0), 0.0)
+        limiter.record_failure(KEYS, now=100.0)
+        self.assertEqual(limiter.check(KEYS, now=100.0), 0.0)
+
+    def test_blocked_session_blocks_other_emails(self):
+        limiter = self.limiter(capacity=100)
+
+        for _ in range(3):
+            limiter.record_failure(KEYS, now=100.0)
+        self.assertGreater(limiter.check(LoginRateLimiter.keys("outro@example.com", "sessao-1"), now=100.0), 0.0)
+        self.assertEqual(limiter.check(LoginRateLimiter.keys("outro@example.com", "sessao-2"), now=100.0), 0.0)
+
+    def test_lru_eviction(self):
+        store = LRUStateStore(max_keys=3)
+        limiter = self.limiter(store=store)
+
+        for i in range(5):
+            limiter.check([f"email:{i}"], now=100.0)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.evictions, 2)
+        self.assertIsNone(store.get("email:0"))
+        self.assertIsNotNone(store.get("email:4"))
+
+    def test_lru_store_honors_ttl(self):
+        store = LRUStateStore()
+        store.put("email:vencido", [1.0, 0.0, 0, 0.0], ttl=-1)
+        store.put("email:valido", [1.0, 0.0, 0, 0.0], ttl=60)
+
+        self.assertIsNone(store.get("email:vencido"))
+        self.assertIsNotNone(store.get("email:valido"))
+        self.assertEqual(len(store), 1)
+
+    def test_concurrent_checks_do_not_overspend(self):
+        limiter = self.limiter(capacity=50, refill_rate=0.0)
+        results = []
+
+        def worker():
+            for _ in range(20):
+                results.append(limiter.check(KEYS, now=100.0))
+
+        threads = [Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(1 for retry_after in results if retry_after == 0.0), 50)
+
+class SessionStoreLimitStateTest(unittest.TestCase):
+    def check_store(self, session_store):
+        limiter = LoginRateLimiter(capacity=100, free_failures=0, base_delay=5.0, store=SessionStoreStateStore(session_store))
+        limiter.record_failure(KEYS)
+
+        # Outra instância do limitador sobre o mesmo armazenamento vê o bloqueio
+        other = LoginRateLimiter(capacity=100, store=SessionStoreStateStore(session_store))
+        self.assertGreater(other.check(KEYS), 0.0)
+        self.assertEqual(len(other.store), 2)
+
+        session_store.put_limit_state("email:vencido", [1.0, 0.0, 0, 0.0], ttl=-1)
+        self.assertIsNone(session_store.get_limit_state("email:vencido"))
+
+    def test_memory_store(self):
+        self.check_store(ShardedSessionStore(3600))
+
+    def test_memory_store_capacity(self):
+        store = ShardedSessionStore(3600)
+        SessionStoreStateStore(store, max_keys=2)
+
+        for i in range(4):
+            store.put_limit_state(f"email:{i}", [1.0, time.time(), 0, 0.0], ttl=60)
+        self.assertEqual(store.limit_state_count(), 2)
+        self.assertEqual(store.limit_evictions, 2)
+        self.assertIsNone(store.get_limit_state("email:0"))
+
+    def test_sqlite_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteSessionStore(os.path.join(tmp, "sessions.db"), 3600)
+            try:
+                self.check_store(store)
+            finally:
+                store.close()
+
+    def test_sqlite_store_rolls_back_failed_attempt(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SQLiteSessionStore(os.path.join(tmp, "sessions.db"), 3600)
+            try:
+                with self.assertRaises(RuntimeError):
+                    with store.limit_transaction():
+                        store.put_limit_state("email:a", [1.0, 0.0, 0, 0.0], ttl=60)
+                        raise RuntimeError
+                self.assertIsNone(store.get_limit_state("email:a"))
+
+                # Duas instâncias sobre o mesmo arquivo não gastam o mesmo token
+                other = SQLiteSessionStore(os.path.join(tmp, "sessions.db"), 3600)
+                limiters = [LoginRateLimiter(capacity=20, refill_rate=0.0, store=SessionStoreStateStore(s)) for s in (store, other)]
+                results = []
+
+                def worker(limiter):
+                    for _ in range(15):
+                        results.append(limiter.check(KEYS, now=100.0))
+
+                threads = [Thread(target=worker, args=(limiter,)) for limiter in limiters]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                other.close()
+                self.assertEqual(sum(1 for retry_after in results if retry_after == 0.0), 20)
+            finally:
+                store.close()
+
+if __name__ == "__main__":
+    unittest.main()
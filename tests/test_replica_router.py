@@ -0,0 +1,157 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from threading import Barrier, Lock, Thread
+from tests._support import use_app_models
+from user_login_panel.config.database import DatabaseRegistry, ReplicaRouter
+from user_login_panel.models.user_model import UserModel
+
+PRIMARY = "sqlite:///primario.db"
+REPLICA = "sqlite:///replica.db"
+
+class SlowProbeRouter(ReplicaRouter):
+    """Roteador com verificação lenta e contada, no lugar do SELECT 1."""
+
+    def __init__(self, *args, healthy=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.healthy = healthy
+        self.probes = 0
+        self._probes_lock = Lock()
+
+    def _probe(self, url):
+        with self._probes_lock:
+            self.probes += 1
+        time.sleep(0.2)
+        return self.healthy
+
+class ReplicaRouterTest(unittest.TestCase):
+    def choose_concurrently(self, router, threads=8):
+        barrier = Barrier(threads)
+        chosen = []
+
+        def worker():
+            barrier.wait()
+            chosen.append(router.choose())
+
+        workers = [Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return chosen
+
+    def test_single_probe_for_due_replica(self):
+        router = SlowProbeRouter(PRIMARY, [REPLICA], retry_interval=60.0)
+        router.mark_failed(REPLICA)
+        # Prazo de nova verificação já vencido
+        router._down_until[REPLICA] = 0.0
+
+        chosen = self.choose_concurrently(router)
+
+        # Só uma requisição verifica (e usa) a réplica; as demais seguem para o primário sem esperar
+        self.assertEqual(router.probes, 1)
+        self.assertEqual(chosen.count(REPLICA), 1)
+        self.assertEqual(chosen.count(PRIMARY), 7)
+        self.assertEqual(router.choose(), REPLICA)
+
+    def test_failed_probe_keeps_replica_down(self):
+        router = SlowProbeRouter(PRIMARY, [REPLICA], retry_interval=60.0, healthy=False)
+        router.mark_failed(REPLICA)
+        router._down_until[REPLICA] = 0.0
+
+        chosen = self.choose_concurrently(router)
+
+        self.assertEqual(router.probes, 1)
+        self.assertEqual(set(chosen), {PRIMARY})
+        self.assertEqual(router.stats()["failures"], 2)
+        self.assertEqual(router.stats()["replicas_down"], 1)
+
+    def test_connect_timeout_args(self):
+        settings = {"connect_timeout": 1.5}
+
+        self.assertEqual(DatabaseRegistry._connect_args(REPLICA, settings), {"timeout": 1.5})
+        self.assertEqual(
+            DatabaseRegistry._connect_args("postgresql+psycopg2://u:p@replica/db", settings), {"connect_timeout": 2}
+        )
+        self.assertEqual(DatabaseRegistry._connect_args(REPLICA, {}), {})
+        self.assertEqual(ReplicaRouter(PRIMARY, [REPLICA], connect_timeout=1.5).engine_settings["connect_timeout"], 1.5)
+
+def user_data(email, name):
+    return {"new_email": email, "new_name": name, "new_enterprise": "E", "new_position": "P", "new_permission": "vendas",
+            "new_exception": "", "autorization_code": "1", "new_password": "senha"}
+
+class UserModelReplicasTest(unittest.TestCase):
+    """Primário e duas réplicas em arquivos SQLite; o nome gravado em cada arquivo mostra de onde veio a leitura."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._restore = use_app_models()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._restore()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = {name: os.path.join(self.tmp.name, f"{name}.db") for name in ("primario", "r1", "r2")}
+        self.urls = {name: f"sqlite:///{path}" for name, path in self.paths.items()}
+
+        primary = UserModel(self.urls["primario"], replica_urls=[])
+        for email in ("a@ex.com", "b@ex.com"):
+            primary.register_user(user_data(email, "primario"))
+        table = primary.User.__tablename__
+        primary.engine.dispose()
+        # Réplicas sincronizadas, cada uma marcada com o próprio nome
+        for name in ("r1", "r2"):
+            shutil.copy(self.paths["primario"], self.paths[name])
+            with sqlite3.connect(self.paths[name]) as conn:
+                conn.execute(f"UPDATE {table} SET name = ?", (name,))
+            conn.close()
+
+        self.model = UserModel(self.urls["primario"], replica_urls=[self.urls["r1"], self.urls["r2"]])
+
+    def tearDown(self):
+        for url in self.urls.values():
+            DatabaseRegistry.get_engine(url).dispose()
+        self.tmp.cleanup()
+
+    def read_name(self, email):
+        user = self.model.get_user(email, fresh=True)
+        return user.name if user else None
+
+    def test_round_robin_across_replicas(self):
+        names = [self.read_name("a@ex.com") for _ in range(4)]
+
+        self.assertEqual(set(names[:2]), {"r1", "r2"})
+        self.assertEqual(names[2:], names[:2])
+        self.assertEqual(self.model.router.stats()["replica_reads"], 4)
+
+    def test_reads_stick_to_primary_after_writes(self):
+        self.assertTrue(self.model.update_user("a@ex.com", {"new_name": "alterado"}))
+        self.assertTrue(self.model.register_user(user_data("c@ex.com", "novo")))
+
+        # As réplicas ainda não têm as escritas: as leituras desses e-mails vão ao primário
+        self.assertEqual(self.read_name("a@ex.com"), "alterado")
+        self.assertEqual(self.read_name("c@ex.com"), "novo")
+        self.assertEqual(self.model.router.stats()["sticky_reads"], 2)
+        # Os demais e-mails continuam nas réplicas
+        self.assertIn(self.read_name("b@ex.com"), {"r1", "r2"})
+
+    def test_unreadable_replica_falls_back_to_primary(self):
+        # Réplica r1 ilegível: o arquivo vira um diretório
+        DatabaseRegistry.get_engine(self.urls["r1"]).dispose()
+        os.remove(self.paths["r1"])
+        os.makedirs(self.paths["r1"])
+
+        names = [self.read_name("b@ex.com") for _ in range(4)]
+
+        # A leitura que caiu em r1 volta ao primário; depois r1 sai do rodízio
+        self.assertEqual(sorted(names), ["primario", "r2", "r2", "r2"])
+        self.assertEqual(self.model.router.stats()["failures"], 1)
+        self.assertEqual(self.model.router.stats()["replicas_down"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
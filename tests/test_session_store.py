@@ -0,0 +1,90 @@
+import os
+import tempfile
+import time
+import unittest
+from user_login_panel.utils.session_store import ShardedSessionStore
+from user_login_panel.utils.sqlite_session_store import SQLiteSessionStore
+
+TIMEOUT = 3600
+
+class ShardedSessionStoreTest(unittest.TestCase):
+    def test_touch_missing_session_is_ignored(self):
+        store = ShardedSessionStore(TIMEOUT)
+        now = time.time()
+
+        store.touch("fantasma", now - 2 * TIMEOUT)
+        self.assertEqual(store.cleanup(now), 0)
+        self.assertEqual(store.count(), 0)
+
+    def test_cleanup_removes_expired(self):
+        store = ShardedSessionStore(TIMEOUT)
+        now = time.time()
+        store.ensure("antiga", now - 2 * TIMEOUT)
+        store.ensure("atual", now)
+
+        self.assertEqual(store.cleanup(now), 1)
+        self.assertFalse(store.contains("antiga"))
+        self.assertTrue(store.contains("atual"))
+
+class SQLiteSessionStoreTest(unittest.TestCase):
+    """Duas instâncias sobre o mesmo arquivo, como duas réplicas do aplicativo."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "sessions.db")
+        self.first = SQLiteSessionStore(path, TIMEOUT, flush_interval=3600, flush_size=3, cleanup_interval=0)
+        self.second = SQLiteSessionStore(path, TIMEOUT, flush_interval=3600, flush_size=3, cleanup_interval=0)
+
+    def tearDown(self):
+        self.first.close()
+        self.second.close()
+        self.tmp.cleanup()
+
+    def test_shared_between_instances(self):
+        now = time.time()
+        self.first.ensure("sessao", now)
+        self.first.update("sessao", {"logged_in": True, "email": "ana@example.com", "tema": "escuro"}, now)
+
+        self.assertTrue(self.second.contains("sessao"))
+        self.assertTrue(self.second.get("sessao", "logged_in"))
+        self.assertEqual(self.second.get_record("sessao").email, "ana@example.com")
+        self.assertEqual(self.second.get("sessao", "tema"), "escuro")
+        self.assertEqual(self.second.count(), 1)
+
+        self.second.clear("sessao", now)
+        self.assertFalse(self.first.get("sessao", "logged_in"))
+
+    def test_touch_is_batched(self):
+        now = time.time()
+        for session_id in ("a", "b", "c"):
+            self.first.ensure(session_id, now - 10)
+
+        # Abaixo de flush_size o último acesso fica só na memória da instância
+        self.first.touch("a", now)
+        self.first.touch("b", now)
+        self.assertAlmostEqual(self.second.get_record("a").last_access, now - 10)
+
+        # O terceiro acesso completa o lote, gravado de uma só vez
+        self.first.touch("c", now)
+        for session_id in ("a", "b", "c"):
+            self.assertAlmostEqual(self.second.get_record(session_id).last_access, now)
+
+        self.first.touch("a", now + 5)
+        self.first.flush()
+        self.assertAlmostEqual(self.second.get_record("a").last_access, now + 5)
+
+    def test_cleanup_by_ttl(self):
+        now = time.time()
+        self.first.ensure("vencida", now - 2 * TIMEOUT)
+        self.first.ensure("ativa", now)
+        self.first.put_limit_state("email:vencido", [1.0, now, 0, 0.0], ttl=-1)
+
+        # A sessão vencida já não é visível antes da limpeza
+        self.assertFalse(self.second.contains("vencida"))
+        self.assertEqual(self.second.cleanup(now), 1)
+        self.assertEqual(self.first.count(), 1)
+        self.assertEqual(self.first.limit_state_count(), 0)
+        self.assertEqual(set(self.first.snapshot()), {"ativa"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from tests._support import use_app_models
+from user_login_panel.models.user_model import UserModel
+from user_login_panel.utils.user_io import ROW_ERROR, read_users
+
+def setUpModule():
+    global _restore
+    _restore = use_app_models()
+
+def tearDownModule():
+    _restore()
+
+def user_line(email, **overrides):
+    row = {"email": email, "name": "N", "enterprise": "E", "position": "P", "permission": "vendas",
+           "exception": "", "autorization": "1", "password": "senha"}
+    row.update(overrides)
+    return json.dumps(row)
+
+class ReadUsersTest(unittest.TestCase):
+    def test_jsonl_bad_lines_become_row_errors(self):
+        rows = list(read_users(io.StringIO('{"email": "a@ex.com"}\n\n[1, 2]\n{"email": \n'), "jsonl"))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0], {"email": "a@ex.com"})
+        self.assertIn(ROW_ERROR, rows[1])
+        self.assertTrue(rows[2][ROW_ERROR].startswith("JSON inválido"))
+
+class RegisterUsersTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.model = UserModel(f"sqlite:///{os.path.join(self.tmp.name, 'usuarios.db')}")
+
+    def tearDown(self):
+        self.model.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_bad_rows_are_reported_and_import_continues(self):
+        lines = [
+            user_line("a@ex.com"),
+            user_line("b@ex.com"),
+            user_line("c@ex.com", password=123456),
+            user_line(42),
+            "[1, 2]",
+            '{"email": "d@ex.com",',
+            user_line("a@ex.com"),
+            user_line("e@ex.com"),
+        ]
+        report = self.model.register_users(read_users(io.StringIO("\n".join(lines)), "jsonl"), chunk_size=2)
+
+        self.assertEqual((report["inserted"], report["skipped"], report["failed"]), (3, 1, 4))
+        errors = {error["row"]: error for error in report["errors"]}
+        self.assertEqual(errors[3]["error"], "Campos devem ser texto: password")
+        self.assertEqual(errors[4]["error"], "Campos devem ser texto: email")
+        self.assertIsNone(errors[5]["email"])
+        self.assertTrue(errors[6]["error"].startswith("JSON inválido"))
+        self.assertEqual(errors[7]["error"], "Usuário já cadastrado")
+        self.assertTrue(self.model.check_login("e@ex.com", "senha"))
+
+    def test_rows_that_are_not_dicts(self):
+        report = self.model.register_users([[1, 2], "texto"])
+
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual([error["row"] for error in report["errors"]], [1, 2])
+
+if __name__ == "__main__":
+    unittest.main()
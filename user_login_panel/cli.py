@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+
+# Permite executar como script, assim como o main.py (sem duplicar o caminho se já estiver no sys.path)
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_DIR not in sys.path:
+    sys.path.append(PROJECT_DIR)
+
+from user_login_panel.utils.user_io import USER_FIELDS, read_users, write_users
+
+def _open(path, mode):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, newline="", encoding="utf-8")
+
+def _format(args):
+    if args.format:
+        return args.format
+    return "jsonl" if args.file.endswith((".jsonl", ".ndjson")) else "csv"
+
+def cmd_import(model, args):
+    with _open(args.file, "r") as stream:
+        report = model.register_users(read_users(stream, _format(args)), chunk_size=args.chunk_size)
+
+    if args.report:
+        with _open(args.report, "w") as stream:
+            write_users(stream, report["errors"], "jsonl", fields=["row", "email", "error"])
+
+    print(f"Cadastrados: {report['inserted']}  Já existentes: {report['skipped']}  Com erro: {report['failed']}", file=sys.stderr)
+    return 1 if report["failed"] else 0
+
+def cmd_export(model, args):
+    fields = [field for field in USER_FIELDS if args.include_password or field != "password"]
+    with _open(args.file, "w") as stream:
+        total = write_users(
+            stream,
+            model.export_users(chunk_size=args.chunk_size, include_password=args.include_password),
+            _format(args),
+            fields=fields
+        )
+    print(f"Exportados: {total}", file=sys.stderr)
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="user-login-panel", description="Importação e exportação de usuários em massa.")
+    parser.add_argument("--db-url", help="URL do banco (padrão: USER_DB do st.secrets)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    importer = subparsers.add_parser("import", help="Cadastra usuários a partir de um arquivo CSV ou JSONL")
+    importer.add_argument("file", help="Arquivo de entrada ('-' para stdin)")
+    importer.add_argument("--format", choices=["csv", "jsonl"])
+    importer.add_argument("--chunk-size", type=int, default=500)
+    importer.add_argument("--report", help="Arquivo JSONL com os erros por linha")
+    importer.set_defaults(handler=cmd_import)
+
+    exporter = subparsers.add_parser("export", help="Exporta os usuários para CSV ou JSONL")
+    exporter.add_argument("file", help="Arquivo de saída ('-' para stdout)")
+    exporter.add_argument("--format", choices=["csv", "jsonl"])
+    exporter.add_argument("--chunk-size", type=int, default=1000)
+    exporter.add_argument("--include-password", action="store_true", help="Inclui o hash das senhas")
+    exporter.set_defaults(handler=cmd_export)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from user_login_panel.models.user_model import UserModel
+    model = UserModel(args.db_url)
+    return args.handler(model, args)
+
+if __name__ == "__main__":
+    sys.exit(main())
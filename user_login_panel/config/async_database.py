@@ -0,0 +1,108 @@
+import asyncio
+from threading import Lock
+from typing import Any, Dict, Optional
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from sqlalchemy.schema import CreateIndex
+from user_login_panel.config.database import DatabaseRegistry, _TimedQueuePool, get_pool_settings
+from user_login_panel.utils.metrics import Metrics
+
+# Driver assíncrono usado para cada banco
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def to_async_url(url: str) -> str:
+    """Converte a URL síncrona (ex.: postgresql+psycopg2) para o driver assíncrono equivalente."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Banco sem driver assíncrono configurado: {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+class _TimedAsyncQueuePool(_TimedQueuePool, AsyncAdaptedQueuePool):
+    """Pool assíncrono que também contabiliza o tempo de espera por uma conexão livre."""
+
+class AsyncDatabaseRegistry:
+    """Registro global de engines assíncronas, indexado pela URL síncrona do banco.
+
+    As conexões pertencem ao laço de eventos que as abriu: as engines devem ser
+    usadas apenas no laço compartilhado do AsyncBridge.
+    """
+
+    _engines: Dict[str, AsyncEngine] = {}
+    _bootstrapped: set = set()
+    _lock = Lock()
+    _bootstrap_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def _create_engine(cls, url: str, settings: Dict[str, Any]) -> AsyncEngine:
+        async_url = to_async_url(url)
+        if make_url(url).get_backend_name() == "sqlite" and make_url(url).database in (None, "", ":memory:"):
+            # Banco em memória precisa de uma única conexão compartilhada
+            return create_async_engine(async_url, poolclass=StaticPool)
+
+        return create_async_engine(
+            async_url,
+            poolclass=_TimedAsyncQueuePool,
+            pool_size=int(settings["pool_size"]),
+            max_overflow=int(settings["max_overflow"]),
+            pool_timeout=float(settings["pool_timeout"]),
+            pool_pre_ping=bool(settings["pool_pre_ping"]),
+            pool_recycle=int(settings["pool_recycle"]),
+        )
+
+    @classmethod
+    def get_engine(cls, url: str, **pool_settings: Any) -> AsyncEngine:
+        """Obtém (ou cria uma única vez) a engine assíncrona do banco da URL síncrona informada."""
+        engine = cls._engines.get(url)
+        if engine is not None:
+            return engine
+
+        with cls._lock:
+            if url not in cls._engines:
+                settings = dict(DatabaseRegistry.POOL_DEFAULTS) if pool_settings else get_pool_settings()
+                settings.update(pool_settings)
+                with Metrics.timer("db_engine_create_seconds"):
+                    engine = cls._create_engine(url, settings)
+                Metrics.instrument_engine(engine.sync_engine)
+                cls._engines[url] = engine
+            return cls._engines[url]
+
+    @classmethod
+    async def bootstrap(cls, metadata, url: str) -> None:
+        """Cria o esquema apenas uma vez por processo para cada URL (executado no laço compartilhado)."""
+        key = (url, id(metadata))
+        if key in cls._bootstrapped:
+            return
+
+        if cls._bootstrap_lock is None:
+            cls._bootstrap_lock = asyncio.Lock()
+        async with cls._bootstrap_lock:
+            if key in cls._bootstrapped:
+                return
+            with Metrics.timer("db_bootstrap_seconds"):
+                async with cls.get_engine(url).begin() as conn:
+                    await conn.run_sync(metadata.create_all)
+                    # create_all não altera tabelas existentes: cria os índices adicionados depois
+                    for table in metadata.sorted_tables:
+                        for index in table.indexes:
+                            await conn.execute(CreateIndex(index, if_not_exists=True))
+            cls._bootstrapped.add(key)
+
+    @classmethod
+    def get_pool_stats(cls, url: str) -> Dict[str, Any]:
+        engine = cls._engines.get(url)
+        if engine is None:
+            return {}
+        return DatabaseRegistry.pool_stats(engine.sync_engine.pool)
+
+    @classmethod
+    async def dispose(cls, url: Optional[str] = None) -> None:
+        """Descarta a engine (ou todas) e remove do registro."""
+        with cls._lock:
+            urls = [url] if url else list(cls._engines)
+            engines = [cls._engines.pop(key, None) for key in urls]
+            cls._bootstrapped = {b for b in cls._bootstrapped if b[0] not in urls}
+        for engine in engines:
+            if engine is not None:
+                await engine.dispose()
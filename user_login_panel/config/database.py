@@ -1,10 +1,370 @@
+import itertools
+import math
+import time
 import streamlit as st
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.pool import QueuePool, StaticPool
+from user_login_panel.utils.metrics import Metrics
+from user_login_panel.utils.session_expiry import ExpiryHeap
 
 def get_db_url():
+    # URL completa opcional (ex.: SQLite em testes e benchmarks)
+    if "url" in st.secrets.USER_DB:
+        return st.secrets.USER_DB.url
+
     return "postgresql+psycopg2://{user}:{password}@{host}:{port}/{dbname}".format(
         user=st.secrets.USER_DB.user,
         password=st.secrets.USER_DB.passw,
         host=st.secrets.USER_DB.host,
         port=st.secrets.USER_DB.port,
         dbname=st.secrets.USER_DB.dbname
-    )
\ No newline at end of file
+    )
+
+def get_replica_urls() -> List[str]:
+    """URLs opcionais das réplicas de leitura (USER_DB.replicas no st.secrets)."""
+    return list(st.secrets.USER_DB.get("replicas", []))
+
+def get_pool_settings() -> Dict[str, Any]:
+    """Obtém as configurações do pool de conexões (seção opcional DB_POOL)."""
+    settings = dict(DatabaseRegistry.POOL_DEFAULTS)
+    settings.update(st.secrets.get("DB_POOL", {}))
+    return settings
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool que contabiliza o tempo de espera por uma conexão livre."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_lock = Lock()
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            with self.wait_lock:
+                self.wait_count += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+class ReplicaRouter:
+    """Escolhe o banco das leituras: uma réplica saudável ou, na falta dela, o primário.
+
+    - Seleção por rodízio (round_robin) ou pela réplica com menos conexões em uso (least_loaded).
+    - Réplica que falha fica fora por `retry_interval` segundos; ao voltar, só é usada
+      depois de responder a um SELECT 1, feito por uma única requisição (as demais seguem
+      sem ela até a verificação terminar).
+    - Conexões às réplicas desistem após `connect_timeout` segundos.
+    - Leitura após escrita: por `sticky_seconds` depois de uma escrita, as leituras com a
+      mesma chave (sessão ou e-mail) vão ao primário, cobrindo o atraso da replicação.
+    """
+
+    STRATEGIES = ("round_robin", "least_loaded")
+
+    def __init__(self, primary_url: str, replica_urls: Iterable[str], strategy: str = "round_robin",
+                 sticky_seconds: float = 5.0, retry_interval: float = 30.0, connect_timeout: float = 2.0,
+                 pool_settings: Optional[Dict[str, Any]] = None):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Estratégia de réplicas desconhecida: {strategy}")
+        self.primary_url = primary_url
+        self.replica_urls = [url for url in replica_urls if url != primary_url]
+        self.strategy = strategy
+        self.retry_interval = retry_interval
+        # Configurações das engines das réplicas (pool padrão + tempo limite de conexão)
+        self.engine_settings = dict(pool_settings or DatabaseRegistry.POOL_DEFAULTS, connect_timeout=connect_timeout)
+        self._lock = Lock()
+        self._turn = itertools.count()
+        # Réplicas fora de uso e o instante em que podem ser verificadas de novo
+        self._down_until: Dict[str, float] = {}
+        # Chaves com escrita recente (leituras presas ao primário até o prazo vencer)
+        self._sticky = ExpiryHeap(sticky_seconds)
+        # Contadores de desempenho
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.failures = 0
+
+    @classmethod
+    def from_settings(cls, primary_url: str, replica_urls: Iterable[str], settings,
+                      pool_settings: Optional[Dict[str, Any]] = None) -> "ReplicaRouter":
+        """Cria o roteador a partir de um dicionário (ex.: seção DB_REPLICAS do st.secrets)."""
+        return cls(
+            primary_url,
+            replica_urls,
+            strategy=settings.get("strategy", "round_robin"),
+            sticky_seconds=float(settings.get("sticky_seconds", 5.0)),
+            retry_interval=float(settings.get("retry_interval", 30.0)),
+            connect_timeout=float(settings.get("connect_timeout", 2.0)),
+            pool_settings=pool_settings
+        )
+
+    def engine(self, url: str) -> Engine:
+        """Engine do banco escolhido; as das réplicas usam `connect_timeout`."""
+        if url == self.primary_url:
+            return DatabaseRegistry.get_engine(url)
+        return DatabaseRegistry.get_engine(url, **self.engine_settings)
+
+    def mark_write(self, *keys: Any) -> None:
+        """Registra uma escrita: leituras com essas chaves vão ao primário durante a janela."""
+        if not self.replica_urls:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                self._sticky.touch(key, now)
+
+    def mark_failed(self, url: str) -> None:
+        """Tira a réplica de uso por `retry_interval` segundos."""
+        with self._lock:
+            self._down_until[url] = time.monotonic() + self.retry_interval
+            self.failures += 1
+        Metrics.inc("db_replica_failures")
+
+    def _probe(self, url: str) -> bool:
+        try:
+            with self.engine(url).connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except SQLAlchemyError:
+            return False
+
+    def _healthy(self, now: float) -> List[str]:
+        healthy, due = [], []
+        with self._lock:
+            for url in self.replica_urls:
+                down_until = self._down_until.get(url)
+                if down_until is None:
+                    healthy.append(url)
+                elif down_until <= now:
+                    # Prazo vencido: esta chamada assume a verificação e adia o prazo,
+                    # para que as concorrentes não verifiquem a mesma réplica
+                    self._down_until[url] = now + self.retry_interval
+                    due.append(url)
+
+        for url in due:
+            # Volta ao rodízio apenas se responder à verificação
+            if self._probe(url):
+                with self._lock:
+                    self._down_until.pop(url, None)
+                healthy.append(url)
+            else:
+                self.mark_failed(url)
+        return healthy
+
+    def choose(self, *keys: Any) -> str:
+        """Retorna a URL do banco para uma leitura associada às chaves informadas."""
+        if not self.replica_urls:
+            return self.primary_url
+
+        now = time.monotonic()
+        with self._lock:
+            self._sticky.pop_expired(now)
+            sticky = any(key in self._sticky for key in keys)
+            if sticky:
+                self.sticky_reads += 1
+        if sticky:
+            return self.primary_url
+
+        healthy = self._healthy(now)
+        if not healthy:
+            with self._lock:
+                self.primary_reads += 1
+            return self.primary_url
+
+        if self.strategy == "least_loaded":
+            url = min(healthy, key=lambda url: self.engine(url).pool.checkedout())
+        else:
+            url = healthy[next(self._turn) % len(healthy)]
+        with self._lock:
+            self.replica_reads += 1
+        return url
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "replicas": len(self.replica_urls),
+                "replicas_down": sum(1 for until in self._down_until.values() if until > time.monotonic()),
+                "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads,
+                "sticky_reads": self.sticky_reads,
+                "sticky_keys": len(self._sticky),
+                "failures": self.failures,
+            }
+
+class DatabaseRegistry:
+    """Registro global (por processo) de engines e fábricas de sessão, indexado pela URL do banco."""
+
+    # Engines compartilhadas por URL
+    _engines: Dict[str, Engine] = {}
+    # Fábricas de sessão compartilhadas por URL
+    _session_factories: Dict[str, sessionmaker] = {}
+    # Pares (URL, metadata) cujo esquema já foi criado neste processo
+    _bootstrapped: set = set()
+    # Roteadores de leitura compartilhados por URL do primário
+    _routers: Dict[str, ReplicaRouter] = {}
+    # Configurações padrão do pool de conexões
+    POOL_DEFAULTS: Dict[str, Any] = {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+    # Lock para operações thread-safe
+    _lock = Lock()
+
+    @classmethod
+    def _connect_args(cls, url: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """Tempo limite de conexão opcional (`connect_timeout`), no parâmetro de cada driver."""
+        timeout = settings.get("connect_timeout")
+        if not timeout:
+            return {}
+        if url.startswith("sqlite"):
+            # No SQLite a conexão é local: o limite é a espera pelo lock do arquivo
+            return {"timeout": float(timeout)}
+        # libpq aceita apenas segundos inteiros
+        return {"connect_timeout": max(1, math.ceil(float(timeout)))}
+
+    @classmethod
+    def _create_engine(cls, url: str, settings: Dict[str, Any]) -> Engine:
+        """Cria uma engine com o pool configurado."""
+        if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:")):
+            # Banco em memória precisa de uma única conexão compartilhada
+            return create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+        return create_engine(
+            url,
+            poolclass=_TimedQueuePool,
+            pool_size=int(settings["pool_size"]),
+            max_overflow=int(settings["max_overflow"]),
+            pool_timeout=float(settings["pool_timeout"]),
+            pool_pre_ping=bool(settings["pool_pre_ping"]),
+            pool_recycle=int(settings["pool_recycle"]),
+            connect_args=cls._connect_args(url, settings),
+        )
+
+    @classmethod
+    def get_engine(cls, url: Optional[str] = None, **pool_settings: Any) -> Engine:
+        """Obtém (ou cria uma única vez) a engine associada à URL."""
+        url = url or get_db_url()
+        engine = cls._engines.get(url)
+        if engine is not None:
+            return engine
+
+        with cls._lock:
+            if url not in cls._engines:
+                settings = dict(cls.POOL_DEFAULTS) if pool_settings else get_pool_settings()
+                settings.update(pool_settings)
+                with Metrics.timer("db_engine_create_seconds"):
+                    engine = cls._create_engine(url, settings)
+                # Tempo de cada instrução SQL (ignorado enquanto as métricas estiverem desligadas)
+                Metrics.instrument_engine(engine)
+                cls._engines[url] = engine
+            return cls._engines[url]
+
+    @classmethod
+    def get_sessionmaker(cls, url: Optional[str] = None) -> sessionmaker:
+        """Obtém a fábrica de sessões compartilhada da URL."""
+        url = url or get_db_url()
+        factory = cls._session_factories.get(url)
+        if factory is not None:
+            return factory
+
+        engine = cls.get_engine(url)
+        with cls._lock:
+            if url not in cls._session_factories:
+                cls._session_factories[url] = sessionmaker(bind=engine)
+            return cls._session_factories[url]
+
+    @classmethod
+    def get_router(cls, url: Optional[str] = None, replica_urls: Optional[Iterable[str]] = None) -> ReplicaRouter:
+        """Obtém o roteador de leituras do primário (réplicas do st.secrets se não informadas)."""
+        url = url or get_db_url()
+        router = cls._routers.get(url)
+        if router is not None and (replica_urls is None or router.replica_urls == list(replica_urls)):
+            return router
+
+        if replica_urls is None:
+            replica_urls = get_replica_urls()
+        settings = st.secrets.get("DB_REPLICAS", {})
+        with cls._lock:
+            router = cls._routers.get(url)
+            if router is None or router.replica_urls != [u for u in replica_urls if u != url]:
+                router = cls._routers[url] = ReplicaRouter.from_settings(
+                    url, replica_urls, settings, get_pool_settings()
+                )
+            return router
+
+    @classmethod
+    def bootstrap(cls, metadata, url: Optional[str] = None) -> None:
+        """Cria o esquema apenas uma vez por processo para cada URL."""
+        url = url or get_db_url()
+        key = (url, id(metadata))
+        if key in cls._bootstrapped:
+            return
+
+        engine = cls.get_engine(url)
+        with cls._lock:
+            if key not in cls._bootstrapped:
+                with Metrics.timer("db_bootstrap_seconds"):
+                    metadata.create_all(engine)
+                    # create_all não altera tabelas existentes: cria os índices adicionados depois
+                    # (IF NOT EXISTS, pois a reflexão não enxerga índices de expressão)
+                    with engine.begin() as conn:
+                        for table in metadata.sorted_tables:
+                            for index in table.indexes:
+                                conn.execute(CreateIndex(index, if_not_exists=True))
+                cls._bootstrapped.add(key)
+
+    @classmethod
+    def get_pool_stats(cls, url: Optional[str] = None) -> Dict[str, Any]:
+        """Retorna estatísticas do pool de conexões da URL."""
+        url = url or get_db_url()
+        engine = cls._engines.get(url)
+        if engine is None:
+            return {}
+        return cls.pool_stats(engine.pool)
+
+    @staticmethod
+    def pool_stats(pool) -> Dict[str, Any]:
+        """Estatísticas de um pool (também usado pelas engines assíncronas)."""
+        stats: Dict[str, Any] = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        if isinstance(pool, _TimedQueuePool):
+            with pool.wait_lock:
+                stats.update({
+                    "wait_count": pool.wait_count,
+                    "wait_total": pool.wait_total,
+                    "wait_max": pool.wait_max,
+                    "wait_avg": pool.wait_total / pool.wait_count if pool.wait_count else 0.0,
+                })
+        return stats
+
+    @classmethod
+    def dispose(cls, url: Optional[str] = None) -> None:
+        """Descarta a engine (ou todas) e remove do registro."""
+        with cls._lock:
+            urls = [url] if url else list(cls._engines)
+            for key in urls:
+                engine = cls._engines.pop(key, None)
+                cls._session_factories.pop(key, None)
+                cls._routers.pop(key, None)
+                cls._bootstrapped = {b for b in cls._bootstrapped if b[0] != key}
+                if engine is not None:
+                    engine.dispose()
@@ -1,18 +1,48 @@
+import math
 import streamlit as st
-from user_login_panel.models.user_model import UserModel
-from user_login_panel.views.user_view import UserViewHelper, UserViewRegisterAndLogin, UserViewSidebar 
+from user_login_panel.resources import get_directory_options, get_miscellaneous, load_logo
+from user_login_panel.utils.metrics import Metrics
+from user_login_panel.utils.rate_limiter import LoginRateLimiter
+from user_login_panel.views.user_view import (
+    UserViewDirectory, UserViewHelper, UserViewMetrics, UserViewRegisterAndLogin, UserViewSidebar
+)
 from user_login_panel.utils.session_manager import SessionManager
+from user_login_panel.utils.validation import is_valid_email
 
 class UserController:
-    # Variáveis de classe para armazenar permissões e exceções
-    _permissions: dict = {}
-    _exceptions: dict = {}
-    
-    def __init__(self):
-        self.model = UserModel()
-        self.view_helper = UserViewHelper()
-        self.view_register_login = UserViewRegisterAndLogin()
-        self.view_sidebar = UserViewSidebar()
+    # Usuários por página do diretório
+    DIRECTORY_PAGE_SIZE = 50
+    DB_TIMEOUT_MESSAGE = "O banco de dados não respondeu a tempo. Tente novamente."
+
+    def __init__(self, model=None, view_helper=None, view_register_login=None, view_sidebar=None, rate_limiter=None,
+                 audit_logger=None, view_metrics=None, view_directory=None, model_factory=None, audit_logger_factory=None):
+        # Modelo e auditoria podem ser instâncias ou fábricas chamadas no primeiro uso (importação tardia do ORM)
+        self._model = model
+        self._model_factory = model_factory
+        self._audit_logger = audit_logger
+        self._audit_logger_factory = audit_logger_factory
+        self.view_helper = view_helper or UserViewHelper()
+        self.view_register_login = view_register_login or UserViewRegisterAndLogin()
+        self.view_sidebar = view_sidebar or UserViewSidebar()
+        self.rate_limiter = rate_limiter or LoginRateLimiter()
+        self.view_metrics = view_metrics or UserViewMetrics()
+        self.view_directory = view_directory or UserViewDirectory()
+
+    @property
+    def model(self):
+        if self._model is None:
+            if self._model_factory is not None:
+                self._model = self._model_factory()
+            else:
+                from user_login_panel.models.user_model import UserModel
+                self._model = UserModel()
+        return self._model
+
+    @property
+    def audit_logger(self):
+        if self._audit_logger is None and self._audit_logger_factory is not None:
+            self._audit_logger = self._audit_logger_factory()
+        return self._audit_logger
     
     def set_logged_in(self, logged=False):
         SessionManager.set_session_state("logged_in", logged)
@@ -21,37 +51,117 @@ class UserController:
         return SessionManager.get_session_state("logged_in", False)
 
     def set_permission(self, permission):
-        session_id = SessionManager.get_session_id()
-        self._permissions[session_id] = permission
+        SessionManager.set_session_state("permission", permission)
     
     def get_permission(self):
-        session_id = SessionManager.get_session_id()
-        return self._permissions.get(session_id)
+        return SessionManager.get_session_state("permission")
     
     def set_exception(self, exception):
-        session_id = SessionManager.get_session_id()
-        self._exceptions[session_id] = exception
+        SessionManager.set_session_state("exception", exception)
     
     def get_exception(self):
-        session_id = SessionManager.get_session_id()
-        return self._exceptions.get(session_id)
+        return SessionManager.get_session_state("exception")
+
+    def get_email(self):
+        return SessionManager.get_session_state("email")
     
+    def has_access(self, resource):
+        """Indica se o usuário logado pode acessar o recurso (permissões compiladas no login)."""
+        return self.get_logged_in() and SessionManager.get_permissions().is_allowed(resource)
+
+    def is_admin(self):
+        """Indica se o usuário pode ver as métricas (recurso METRICS.admin_permission, "admin" por padrão)."""
+        return self.has_access(st.secrets.get("METRICS", {}).get("admin_permission", "admin"))
+
+    def handle_metrics_page(self):
+        """Exibe as métricas, apenas para administradores."""
+        if self.is_admin():
+            self.view_metrics.display(Metrics.snapshot(), Metrics.to_prometheus())
+
+    def can_view_directory(self):
+        """Indica se o usuário pode ver o diretório (recurso DIRECTORY.resource, liberado por "admin" por padrão)."""
+        resource = st.secrets.get("DIRECTORY", {}).get("resource", "admin.diretorio")
+        return self.has_access(resource)
+
+    def handle_directory_page(self):
+        """Exibe o diretório de usuários paginado, apenas para quem tem permissão."""
+        if not self.can_view_directory():
+            return
+
+        # Como nas abas, consulta lenta do modelo assíncrono (TimeoutError) vira aviso em vez de erro na página
+        try:
+            options = get_directory_options()
+        except TimeoutError:
+            self.view_helper.show_message(self.DB_TIMEOUT_MESSAGE, "error")
+            return
+
+        filters = self.view_directory.filters(options)
+        # Pilha de cursores das páginas visitadas; reiniciada quando a busca ou os filtros mudam
+        directory = SessionManager.get_session_state("directory")
+        if directory is None or directory["filters"] != filters:
+            directory = {"filters": filters, "cursors": [None]}
+            SessionManager.set_session_state("directory", directory)
+
+        cursors = directory["cursors"]
+        try:
+            users, next_cursor = self.model.list_users(after=cursors[-1], limit=self.DIRECTORY_PAGE_SIZE, **filters)
+        except TimeoutError:
+            self.view_helper.show_message(self.DB_TIMEOUT_MESSAGE, "error")
+            return
+        previous_clicked, next_clicked = self.view_directory.display(
+            users, page=len(cursors), has_previous=len(cursors) > 1, has_next=next_cursor is not None
+        )
+
+        if next_clicked and next_cursor is not None:
+            cursors.append(next_cursor)
+        elif previous_clicked and len(cursors) > 1:
+            cursors.pop()
+        else:
+            return
+
+        SessionManager.set_session_state("directory", directory)
+        st.rerun()
+
+    def audit(self, action, email, success, detail=None):
+        """Registra um evento de auditoria (assíncrono) quando há um registrador configurado."""
+        if self.audit_logger is not None:
+            self.audit_logger.log(action, email, success, SessionManager.get_session_id(), detail)
+
     def handle_login(self):
         email, password = self.view_register_login.login_form()
 
         if st.button("Login"):
-            if not self.model.is_valid_email(email):
+            if not is_valid_email(email):
                 self.view_helper.show_message("Por favor, insira um e-mail válido.", "warning")
             else: 
+                # Limites verificados antes de qualquer acesso ao banco ou cálculo de hash
+                limit_keys = self.rate_limiter.keys(email, SessionManager.get_session_id())
+                retry_after = self.rate_limiter.check(limit_keys)
+
+                if retry_after > 0:
+                    self.audit("login", email, False, "rate_limited")
+                    self.view_helper.show_message(f"Muitas tentativas. Tente novamente em {math.ceil(retry_after)} segundos.", "warning")
+                    return
+
                 user = self.model.check_login(email, password)
                 
-                if user:                
-                    self.set_logged_in(True)
-                    self.view_sidebar.set_user(user.name)
-                    self.set_permission(user.permission)
-                    self.set_exception(user.exception)
+                if user:
+                    self.rate_limiter.record_success(limit_keys)
+                    self.audit("login", email, True)
+                    # Grava todo o estado de login no registro da sessão de uma só vez
+                    SessionManager.update_session_state({
+                        "logged_in": True,
+                        "email": user.email,
+                        "user": user.name,
+                        "permission": user.permission,
+                        "exception": user.exception,
+                    })
+                    # Compila permissões e exceções uma única vez, já no login
+                    SessionManager.get_permissions()
                     self.view_helper.set_page("protected", True)
                 else:    
+                    self.rate_limiter.record_failure(limit_keys)
+                    self.audit("login", email, False, "invalid_credentials")
                     self.view_helper.show_message("E-mail ou senha incorretos.", "warning")
 
     def handle_register(self):
@@ -59,7 +169,7 @@ class UserController:
         reg_clicked, upd_clicked, del_clicked = self.view_register_login.display_action_buttons()
 
         if reg_clicked or upd_clicked or del_clicked:
-            if not self.model.is_valid_email(reg_data["new_email"]):
+            if not is_valid_email(reg_data["new_email"]):
                 self.view_helper.show_message("Por favor, insira um e-mail válido.", "warning")
             elif reg_clicked and self.model.check_email(reg_data["new_email"]):
                 self.view_helper.show_message("Usuário já cadastrado!", "warning")
@@ -79,40 +189,72 @@ class UserController:
                 self.view_helper.show_message("Por favor, insira uma senha.", "warning")        
             elif (reg_clicked or upd_clicked) and reg_data["new_password"] != reg_data["confirm_password"]:
                 self.view_helper.show_message("As senhas não coincidem.", "warning")
-            elif reg_clicked and self.model.register_user(reg_data):
-                self.view_helper.show_message("Usuário cadastrado com sucesso!", "success")
-            elif upd_clicked and self.model.update_user(reg_data["new_email"], reg_data):
-                self.view_helper.show_message("Usuário alterado com sucesso!", "success")
-            elif del_clicked and self.model.delete_user(reg_data["new_email"]):
-                self.view_helper.show_message("Usuário excluído com sucesso!", "success")
+            elif reg_clicked:
+                registered = self.model.register_user(reg_data)
+                self.audit("register", reg_data["new_email"], registered)
+                if registered:
+                    self.view_helper.show_message("Usuário cadastrado com sucesso!", "success")
+            elif upd_clicked:
+                updated = self.model.update_user(reg_data["new_email"], reg_data)
+                self.audit("update", reg_data["new_email"], updated)
+                if updated:
+                    self.view_helper.show_message("Usuário alterado com sucesso!", "success")
+            elif del_clicked:
+                deleted = self.model.delete_user(reg_data["new_email"])
+                self.audit("delete", reg_data["new_email"], deleted)
+                if deleted:
+                    self.view_helper.show_message("Usuário excluído com sucesso!", "success")
+
+    # Cada aba é um fragmento: digitar ou clicar nela reexecuta apenas a aba, sem logotipo,
+    # título, sessão e controlador. O login bem-sucedido chama st.rerun(), que reexecuta o app inteiro.
+    # O modelo assíncrono (DB_ASYNC) cancela consultas lentas com TimeoutError: avisa em vez de quebrar a página
+
+    @st.fragment
+    @Metrics.timed("fragment_login_seconds")
+    def login_fragment(self):
+        try:
+            self.handle_login()
+        except TimeoutError:
+            self.view_helper.show_message(self.DB_TIMEOUT_MESSAGE, "error")
+
+    @st.fragment
+    @Metrics.timed("fragment_register_seconds")
+    def register_fragment(self):
+        try:
+            self.handle_register()
+        except TimeoutError:
+            self.view_helper.show_message(self.DB_TIMEOUT_MESSAGE, "error")
 
     def handle_tabs(self):
         tabs = self.view_register_login.login_page()
         
         with tabs[0]:
-            self.handle_login()
+            self.login_fragment()
         
         with tabs[1]:
-            self.handle_register()
+            self.register_fragment()
     
     def handle_main_page(self):
-        self.view_helper.set_logo(st.secrets.MISCELLANEOUS.logo)
-        self.view_helper.set_title(st.secrets.MISCELLANEOUS.title)
-                    
-        if "current_page" not in st.session_state:
-            st.session_state.current_page = "login"
+        miscellaneous = get_miscellaneous()
+        self.view_helper.set_logo(load_logo(miscellaneous["logo"]))
+        self.view_helper.set_title(miscellaneous["title"])
 
-        if not self.get_logged_in():
-            self.set_logged_in(False)
+        current_page = self.view_helper.get_page()
 
-        if st.session_state.current_page == "login":
+        if current_page == "login":
             self.handle_tabs()
-        elif st.session_state.current_page == "protected":
+        elif current_page == "protected":
             if self.get_logged_in():                
                 self.view_sidebar.display()
 
                 if self.view_sidebar.get_logout_button():
-                    self.set_logged_in(False)
+                    SessionManager.update_session_state({
+                        "logged_in": False,
+                        "email": None,
+                        "user": None,
+                        "permission": None,
+                        "exception": None,
+                    })
                     self.view_helper.set_page("login", True)
             else:
                 self.view_helper.show_message("Você precisa fazer login para acessar esta página.", "warning")
@@ -2,32 +2,51 @@ import sys
 import os
 import streamlit as st
 
-# Adicionando o caminho do diretório do projeto ao sys.path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Adicionando o caminho do diretório do projeto ao sys.path (o Streamlit executa este arquivo a cada interação:
+# sem a verificação, o caminho seria acrescentado de novo em toda execução)
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_DIR not in sys.path:
+    sys.path.append(PROJECT_DIR)
 
-from user_login_panel.controllers.user_controller import UserController
+from user_login_panel.resources import get_recent_events, get_user_controller, setup_metrics
 from user_login_panel.utils.session_manager import SessionManager
 
 # Configuração da página deve ser o primeiro comando Streamlit
 st.set_page_config(page_title="User Login Panel", layout="wide")
 
 def main():
-    # Inicializa o gerenciador de sessão
+    with setup_metrics().timer("rerun_seconds"):
+        run()
+
+def run():
+    # Inicializa o gerenciador de sessão (armazenamento definido em st.secrets, seção SESSION)
+    SessionManager.configure()
     SessionManager.get_session_id()
 
-    user_controller = UserController()
+    # Controlador, modelo e views são reaproveitados entre as execuções do script
+    user_controller = get_user_controller()
     user_view = user_controller.handle_main_page()
 
     if user_controller.get_logged_in():
         sidebar = user_view.get_sidebar()
 
-        # Adicionando mais componentes diretamente
-        with sidebar:
-            st.write(f"Data Inicial: {user_view.get_start_date()}")
-            st.write(f"Data Final: {user_view.get_end_date()}")
-        
         st.write(user_controller.get_permission())
         st.write(user_controller.get_exception())
+
+        # Eventos de auditoria do usuário no período selecionado na barra lateral: em cache por período,
+        # para que as demais interações não consultem o banco; o botão Atualizar busca de novo
+        period = (user_controller.get_email(), user_view.get_start_date(), user_view.get_end_date())
+        if user_view.get_refresh_button():
+            get_recent_events.clear(*period)
+        st.dataframe(get_recent_events(*period), use_container_width=True)
+
+        # Página de métricas, visível apenas para administradores
+        if user_controller.is_admin() and sidebar.checkbox("Mostrar métricas", key=f"{SessionManager.get_session_id()}_show_metrics"):
+            user_controller.handle_metrics_page()
+
+        # Diretório de usuários, visível apenas para quem tem o recurso do diretório
+        if user_controller.can_view_directory() and sidebar.checkbox("Diretório de usuários", key=f"{SessionManager.get_session_id()}_show_directory"):
+            user_controller.handle_directory_page()
         
 # Execução do programa
 if __name__ == "__main__":
@@ -0,0 +1,260 @@
+import asyncio
+import inspect
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from user_login_panel.config.async_database import AsyncDatabaseRegistry
+from user_login_panel.models.user_cache import UserSnapshot
+from user_login_panel.models.user_model import UPDATE_FIELDS, UserModelBase
+from user_login_panel.utils.async_bridge import AsyncBridge
+from user_login_panel.utils.metrics import Metrics
+from user_login_panel.utils.user_io import chunked
+
+class AsyncUserModel(UserModelBase):
+    """UserModel sobre a extensão asyncio do SQLAlchemy (asyncpg no PostgreSQL, aiosqlite no SQLite).
+
+    Mesmos métodos do UserModel, como corrotinas. Muitas sessões compartilham um pool
+    pequeno: a conexão só fica ocupada durante cada instrução, e a espera pelo banco
+    não prende uma thread. Deve ser usado no laço do AsyncBridge (ver BridgedUserModel).
+    """
+
+    def __init__(self, db_url=None, subject=None):
+        super().__init__(db_url, subject)
+        # Engine assíncrona registrada pela URL síncrona (o cache de usuários é o mesmo do UserModel)
+        self.engine = AsyncDatabaseRegistry.get_engine(self.db_url)
+        self._schema_ready = False
+
+    async def _ensure_schema(self):
+        if not self._schema_ready:
+            await AsyncDatabaseRegistry.bootstrap(self.schema.Base.metadata, self.db_url)
+            self._schema_ready = True
+
+    def get_pool_stats(self):
+        return AsyncDatabaseRegistry.get_pool_stats(self.db_url)
+
+    @Metrics.timed("user_model_get_user_seconds")
+    async def get_user(self, email, fresh=False):
+        """Obtém o usuário pelo e-mail, consultando o cache antes do banco (exceto com fresh=True)."""
+        snapshot = None if fresh else self.cache.get(email)
+        if snapshot is not None:
+            return snapshot
+
+        await self._ensure_schema()
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(self._select_user(email))).first()
+
+        if row is None:
+            return None
+        snapshot = UserSnapshot.from_row(row)
+        self.cache.put(snapshot)
+        return snapshot
+
+    async def hash_password(self, password):
+        return await self.hasher.hash_async(password)
+
+    @Metrics.timed("user_model_check_email_seconds")
+    async def check_email(self, email):
+        return await self.get_user(email) is not None
+
+    @Metrics.timed("user_model_check_login_seconds")
+    async def check_login(self, email, password):
+        # Busca pelo e-mail e verifica a senha fora do SQL (o hash tem sal), sempre no banco (ver UserModel.check_login)
+        user = await self.get_user(email, fresh=True)
+
+        if not await self.hasher.verify_async(password, user.password if user else None):
+            return None
+
+        if self.hasher.needs_rehash(user.password):
+            await self._rehash_password(user, password)
+
+        return user
+
+    async def _rehash_password(self, user, password):
+        """Regrava a senha na versão atual do hash após um login bem-sucedido."""
+        stmt = self._rehash_stmt(user, await self.hash_password(password))
+
+        async with self.engine.begin() as conn:
+            await conn.execute(stmt)
+
+        self.cache.invalidate(user.email)
+
+    @Metrics.timed("user_model_register_user_seconds")
+    async def register_user(self, inserted_data):
+        await self._ensure_schema()
+        values = self._register_values(inserted_data, await self.hash_password(inserted_data["new_password"]))
+        stmt = self._insert_ignoring_conflict(values)
+
+        try:
+            async with self.engine.begin() as conn:
+                if stmt is not None:
+                    # Uma única ida ao banco; sem linha retornada = usuário já cadastrado
+                    created = (await conn.execute(stmt.returning(self.User.id))).first() is not None
+                else:
+                    await conn.execute(insert(self.User).values(**values))
+                    created = True
+        except IntegrityError:
+            created = False  # Usuário já cadastrado (dialetos sem ON CONFLICT)
+
+        if created:
+            self.cache.invalidate(inserted_data["new_email"])
+        return created
+
+    @Metrics.timed("user_model_update_user_seconds")
+    async def update_user(self, email, updated_data):
+        await self._ensure_schema()
+        values = {column: updated_data[key] for column, key in UPDATE_FIELDS.items() if key in updated_data}
+
+        if "new_password" in updated_data:
+            values["password"] = await self.hash_password(updated_data["new_password"])
+
+        if not values:
+            # Nada a alterar: um UPDATE sem colunas é inválido, basta informar se o usuário existe
+            return await self.check_email(email)
+
+        stmt = self._update_stmt(email, values)
+
+        async with self.engine.begin() as conn:
+            result = await conn.execute(stmt)
+            updated = result.first() is not None if result.returns_rows else result.rowcount > 0
+
+        if updated:
+            self.cache.invalidate(email)
+        return updated
+
+    @Metrics.timed("user_model_delete_user_seconds")
+    async def delete_user(self, email):
+        await self._ensure_schema()
+        stmt = self._delete_stmt(email)
+
+        async with self.engine.begin() as conn:
+            result = await conn.execute(stmt)
+            deleted = result.first() is not None if result.returns_rows else result.rowcount > 0
+
+        if deleted:
+            self.cache.invalidate(email)
+        return deleted
+
+    async def _insert_chunk(self, conn, values):
+        """Insere um lote e retorna o conjunto de e-mails efetivamente cadastrados."""
+        stmt = self._bulk_stmt()
+
+        if stmt is not None:
+            return {email for (email,) in await conn.execute(stmt, values)}
+
+        inserted = set()
+        for row in values:
+            try:
+                async with conn.begin_nested():
+                    await conn.execute(insert(self.User).values(**row))
+                inserted.add(row["email"])
+            except IntegrityError:
+                pass
+        return inserted
+
+    @Metrics.timed("user_model_register_users_seconds")
+    async def register_users(self, rows, chunk_size=500):
+        """
+        Cadastra usuários em massa, com commit por lote.
+        :param rows: Iterável de dicionários com as colunas de USER_FIELDS (senha em texto puro).
+        :param chunk_size: Número de linhas por lote/commit.
+        :return: Relatório com totais e a lista de erros por linha.
+        """
+        await self._ensure_schema()
+        report = {"inserted": 0, "skipped": 0, "failed": 0, "errors": []}
+        row_number = 0
+
+        for chunk in chunked(rows, chunk_size):
+            valid, row_number = self._split_bulk_chunk(chunk, row_number, report)
+            if not valid:
+                continue
+
+            # Falha no hash ou no banco reprova apenas o lote, que entra no relatório
+            try:
+                hashes = await asyncio.gather(*(self.hash_password(row["password"]) for _, row in valid))
+                values = self._bulk_values(valid, hashes)
+                async with self.engine.begin() as conn:
+                    inserted = await self._insert_chunk(conn, values)
+            except (SQLAlchemyError, ValueError, TypeError) as exc:
+                self._report_bulk_failure(valid, exc, report)
+                continue
+
+            self._report_bulk_chunk(valid, inserted, report)
+
+        return report
+
+    async def export_users(self, chunk_size=1000, include_password=False):
+        """
+        Exporta os usuários em fluxo, lendo o banco em lotes.
+        :return: Gerador assíncrono de dicionários com as colunas de USER_FIELDS.
+        """
+        await self._ensure_schema()
+        stmt = self._export_stmt(include_password)
+
+        async with self.engine.connect() as conn:
+            result = await conn.stream(stmt.execution_options(yield_per=chunk_size))
+            async for partition in result.partitions():
+                for row in partition:
+                    yield dict(row._mapping)
+
+    @Metrics.timed("user_model_list_users_seconds")
+    async def list_users(self, search=None, enterprise=None, position=None, permission=None, after=None, limit=50):
+        """Lista uma página de usuários em ordem de e-mail, com paginação por cursor (ver UserModel.list_users)."""
+        await self._ensure_schema()
+        stmt = self._list_users_stmt(search, enterprise, position, permission, after, limit)
+
+        async with self.engine.connect() as conn:
+            rows = [dict(row._mapping) for row in await conn.execute(stmt)]
+
+        return self._page(rows, limit)
+
+    @Metrics.timed("user_model_get_directory_options_seconds")
+    async def get_directory_options(self):
+        """Valores distintos de cada coluna filtrável do diretório."""
+        await self._ensure_schema()
+        async with self.engine.connect() as conn:
+            return {field: list((await conn.execute(stmt)).scalars()) for field, stmt in self._directory_option_stmts()}
+
+class BridgedUserModel:
+    """Fachada síncrona do AsyncUserModel para o script do Streamlit.
+
+    Cada método executa a corrotina correspondente no laço do AsyncBridge e aguarda
+    o resultado por até `timeout` segundos (padrão do modelo ou `timeout=` na
+    chamada). Estourado o limite, a consulta é cancelada e TimeoutError é lançado.
+    """
+
+    def __init__(self, model: AsyncUserModel, timeout: float = 10.0):
+        self.model = model
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls, settings, db_url=None, subject=None) -> "BridgedUserModel":
+        """Cria a fachada a partir de um dicionário (ex.: seção DB_ASYNC do st.secrets)."""
+        return cls(AsyncUserModel(db_url, subject), timeout=float(settings.get("timeout", 10.0)))
+
+    def __getattr__(self, name):
+        attribute = getattr(self.model, name)
+        if inspect.isasyncgenfunction(attribute):
+            return self._wrap_generator(attribute)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        def call(*args, timeout=None, **kwargs):
+            return AsyncBridge.run(attribute(*args, **kwargs), self.timeout if timeout is None else timeout)
+
+        call.__name__ = name
+        call.__doc__ = attribute.__doc__
+        return call
+
+    def _wrap_generator(self, function):
+        def iterate(*args, timeout=None, **kwargs):
+            # Cada item é buscado no laço compartilhado, com o tempo limite aplicado por item
+            iterator = function(*args, **kwargs)
+            try:
+                while True:
+                    try:
+                        yield AsyncBridge.run(iterator.__anext__(), self.timeout if timeout is None else timeout)
+                    except StopAsyncIteration:
+                        return
+            finally:
+                AsyncBridge.run(iterator.aclose(), self.timeout)
+
+        return iterate
@@ -0,0 +1,189 @@
+import atexit
+import queue
+import time
+import streamlit as st
+from datetime import date, datetime, time as dt_time, timedelta
+from threading import Event, Lock, Thread
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from user_login_panel.config.database import DatabaseRegistry, get_db_url
+from user_login_panel.models.schema import get_schema
+
+class AuditLogger:
+    """Registro assíncrono de eventos de auditoria.
+
+    Os eventos entram em uma fila em memória limitada e uma thread em segundo
+    plano os grava em lote, quando o lote enche ou quando vence o intervalo de
+    gravação. Com a fila cheia, o evento é descartado e contabilizado.
+    """
+
+    def __init__(self, db_url=None, queue_size=10000, batch_size=200, flush_interval=1.0, block_timeout=0.0, subject=None):
+        # Tabela audit_<subject> definida na inicialização (seção MISCELLANEOUS do st.secrets)
+        schema = get_schema(subject or st.secrets.MISCELLANEOUS.subject)
+        self.AuditEvent = schema.AuditEvent
+        self.db_url = db_url or get_db_url()
+        self.engine = DatabaseRegistry.get_engine(self.db_url)
+        DatabaseRegistry.bootstrap(schema.Base.metadata, self.db_url)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Tempo máximo que log() espera por espaço na fila antes de descartar (0 = não espera)
+        self.block_timeout = block_timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = Event()
+        self._flushed = Event()
+        self._writer = None
+        self._writer_lock = Lock()
+        self._stats_lock = Lock()
+        # Contadores de desempenho
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+    @classmethod
+    def from_settings(cls, settings, db_url=None, subject=None) -> "AuditLogger":
+        """Cria o registrador a partir de um dicionário (ex.: seção AUDIT do st.secrets)."""
+        return cls(
+            db_url=db_url,
+            subject=subject,
+            queue_size=int(settings.get("queue_size", 10000)),
+            batch_size=int(settings.get("batch_size", 200)),
+            flush_interval=float(settings.get("flush_interval", 1.0)),
+            block_timeout=float(settings.get("block_timeout", 0.0))
+        )
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = Thread(target=self._run, name="audit-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+
+    def log(self, action, email, success, session_id=None, detail=None):
+        """Enfileira um evento sem bloquear a requisição; retorna False se ele foi descartado."""
+        self._ensure_writer()
+        event = {
+            "created_at": datetime.now(),
+            "action": action,
+            "email": email,
+            "success": bool(success),
+            "session_id": session_id,
+            "detail": detail,
+        }
+        try:
+            if self.block_timeout > 0:
+                self._queue.put(event, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+
+        with self._stats_lock:
+            self.enqueued += 1
+        return True
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            timeout = max(deadline - time.monotonic(), 0.0)
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                pass
+
+            # Esvazia o que já estiver na fila, até o tamanho do lote
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline or self._stop.is_set():
+                if batch:
+                    self._write(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval
+                if self._queue.empty():
+                    self._flushed.set()
+                    if self._stop.is_set():
+                        return
+
+    def _write(self, batch):
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(self.AuditEvent), batch)
+        except SQLAlchemyError:
+            with self._stats_lock:
+                self.failed += len(batch)
+            return
+
+        with self._stats_lock:
+            self.written += len(batch)
+            self.batches += 1
+
+    def flush(self, timeout=None):
+        """Aguarda a gravação dos eventos já enfileirados."""
+        if self._writer is None:
+            return
+        self._flushed.clear()
+        self._flushed.wait(timeout if timeout is not None else self.flush_interval * 2 + 5)
+
+    def close(self):
+        """Grava os eventos pendentes e encerra a thread de gravação."""
+        if self._writer is None:
+            return
+        self._stop.set()
+        self._writer.join(timeout=10)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "written": self.written,
+                "batches": self.batches,
+                "failed": self.failed,
+            }
+
+    def recent_events(self, email=None, start_date=None, end_date=None, limit=100):
+        """
+        Lista os eventos mais recentes, opcionalmente filtrados por usuário e período.
+        :param email: E-mail do usuário.
+        :param start_date: Data (ou data e hora) inicial, inclusiva.
+        :param end_date: Data final, inclusiva (o dia inteiro).
+        :param limit: Número máximo de eventos.
+        """
+        stmt = select(self.AuditEvent).order_by(self.AuditEvent.created_at.desc(), self.AuditEvent.id.desc()).limit(limit)
+
+        if email:
+            stmt = stmt.where(self.AuditEvent.email == email)
+        if start_date:
+            if not isinstance(start_date, datetime):
+                start_date = datetime.combine(start_date, dt_time.min)
+            stmt = stmt.where(self.AuditEvent.created_at >= start_date)
+        if end_date:
+            if isinstance(end_date, date) and not isinstance(end_date, datetime):
+                end_date = datetime.combine(end_date + timedelta(days=1), dt_time.min)
+                stmt = stmt.where(self.AuditEvent.created_at < end_date)
+            else:
+                stmt = stmt.where(self.AuditEvent.created_at <= end_date)
+
+        with self.engine.connect() as conn:
+            return [
+                {
+                    "created_at": event.created_at,
+                    "action": event.action,
+                    "email": event.email,
+                    "success": event.success,
+                    "detail": event.detail,
+                }
+                for event in conn.execute(stmt)
+            ]
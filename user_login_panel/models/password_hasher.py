@@ -0,0 +1,146 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+from user_login_panel.utils.metrics import Metrics
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+class PasswordHasher:
+    """Hash de senhas com KDF versionada (scrypt ou PBKDF2), executada em um pool de threads limitado.
+
+    Formatos armazenados:
+      - legado:  64 caracteres hexadecimais (SHA-256 sem sal)
+      - scrypt:  $scrypt$n=<n>,r=<r>,p=<p>$<sal>$<hash>
+      - pbkdf2:  $pbkdf2-sha256$i=<iterações>$<sal>$<hash>
+    """
+
+    # Parâmetros de custo padrão de cada versão
+    DEFAULTS: Dict[str, Dict[str, int]] = {
+        "scrypt": {"n": 2 ** 14, "r": 8, "p": 1},
+        "pbkdf2-sha256": {"i": 600000},
+    }
+    SALT_BYTES = 16
+    HASH_BYTES = 32
+
+    # Pool compartilhado pelo processo (hashlib libera o GIL durante a KDF)
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = Lock()
+
+    def __init__(self, algorithm: str = "scrypt", workers: Optional[int] = None, **params: Any):
+        if algorithm not in self.DEFAULTS:
+            raise ValueError(f"Algoritmo de hash desconhecido: {algorithm}")
+        self.algorithm = algorithm
+        self.params = {key: int(params.get(key, value)) for key, value in self.DEFAULTS[algorithm].items()}
+        self.workers = workers or os.cpu_count() or 1
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "PasswordHasher":
+        """Cria o hasher a partir de um dicionário (ex.: seção PASSWORD_HASH do st.secrets)."""
+        settings = dict(settings)
+        algorithm = settings.pop("algorithm", "scrypt")
+        workers = settings.pop("workers", None)
+        return cls(algorithm, workers=int(workers) if workers else None, **settings)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        executor = PasswordHasher._executor
+        if executor is None:
+            with PasswordHasher._executor_lock:
+                if PasswordHasher._executor is None:
+                    PasswordHasher._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hasher")
+                executor = PasswordHasher._executor
+        return executor
+
+    @staticmethod
+    def _derive(password: str, algorithm: str, params: Dict[str, int], salt: bytes, length: int) -> bytes:
+        if algorithm == "scrypt":
+            n, r, p = params["n"], params["r"], params["p"]
+            return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=length)
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, params["i"], dklen=length)
+
+    @classmethod
+    def _parse(cls, stored: str):
+        """Separa algoritmo, parâmetros, sal e hash de um valor armazenado (ValueError se malformado)."""
+        _, algorithm, params, salt, digest = stored.split("$")
+        parsed = {key: int(value) for key, value in (item.split("=") for item in params.split(","))}
+        salt, digest = _b64decode(salt), _b64decode(digest)
+        if algorithm not in cls.DEFAULTS or parsed.keys() != cls.DEFAULTS[algorithm].keys():
+            raise ValueError(f"Hash armazenado com algoritmo ou parâmetros inválidos: {algorithm}")
+        # Hash truncado não pode ser aceito com um dklen menor
+        if not salt or len(digest) != cls.HASH_BYTES:
+            raise ValueError("Hash armazenado com sal ou tamanho inválido")
+        return algorithm, parsed, salt, digest
+
+    @staticmethod
+    def is_legacy(stored: str) -> bool:
+        return not stored.startswith("$")
+
+    def _hash_sync(self, password: str) -> str:
+        salt = secrets.token_bytes(self.SALT_BYTES)
+        digest = self._derive(password, self.algorithm, self.params, salt, self.HASH_BYTES)
+        params = ",".join(f"{key}={value}" for key, value in self.params.items())
+        return f"${self.algorithm}${params}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def _verify_sync(self, password: str, stored: str) -> bool:
+        if self.is_legacy(stored):
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy.encode(), stored.encode())
+        try:
+            algorithm, params, salt, digest = self._parse(stored)
+            # Parâmetros recusados pela KDF (ex.: n de scrypt que não é potência de 2) também invalidam o hash
+            candidate = self._derive(password, algorithm, params, salt, len(digest))
+        except ValueError:
+            return False
+        return hmac.compare_digest(candidate, digest)
+
+    @Metrics.timed("password_hash_seconds")
+    def hash(self, password: str) -> str:
+        """Gera o hash da senha na versão atual (executado no pool)."""
+        return self._pool().submit(self._hash_sync, password).result()
+
+    @Metrics.timed("password_hash_many_seconds")
+    def hash_many(self, passwords: Iterable[str]) -> List[str]:
+        """Gera os hashes de várias senhas em paralelo no pool (ex.: importação em massa), na ordem recebida."""
+        pool = self._pool()
+        futures = [pool.submit(self._hash_sync, password) for password in passwords]
+        return [future.result() for future in futures]
+
+    @Metrics.timed("password_verify_seconds")
+    def verify(self, password: str, stored: Optional[str]) -> bool:
+        """Verifica a senha em tempo constante; sem hash armazenado, gasta o mesmo custo e retorna False."""
+        if stored is None:
+            self._pool().submit(self._hash_sync, password).result()
+            return False
+        return self._pool().submit(self._verify_sync, password, stored).result()
+
+    @Metrics.timed("password_hash_seconds")
+    async def hash_async(self, password: str) -> str:
+        """Versão assíncrona de hash(): aguarda o pool sem bloquear o laço de eventos."""
+        return await asyncio.wrap_future(self._pool().submit(self._hash_sync, password))
+
+    @Metrics.timed("password_verify_seconds")
+    async def verify_async(self, password: str, stored: Optional[str]) -> bool:
+        """Versão assíncrona de verify()."""
+        if stored is None:
+            await asyncio.wrap_future(self._pool().submit(self._hash_sync, password))
+            return False
+        return await asyncio.wrap_future(self._pool().submit(self._verify_sync, password, stored))
+
+    def needs_rehash(self, stored: str) -> bool:
+        """Indica se o hash armazenado é legado ou usa outra versão/custo."""
+        if self.is_legacy(stored):
+            return True
+        try:
+            algorithm, params, _, _ = self._parse(stored)
+        except ValueError:
+            return True
+        return algorithm != self.algorithm or params != self.params
@@ -0,0 +1,66 @@
+from functools import lru_cache
+from typing import NamedTuple
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, func
+from sqlalchemy.orm import declarative_base
+
+class Schema(NamedTuple):
+    """Tabelas de um assunto (MISCELLANEOUS.subject), com metadados próprios."""
+    Base: type
+    User: type
+    AuditEvent: type
+
+@lru_cache(maxsize=None)
+def get_schema(subject: str) -> Schema:
+    """
+    Declara as tabelas users_<subject> e audit_<subject>, uma única vez por assunto.
+    Os nomes são definidos na inicialização dos modelos, e não na importação do módulo.
+    :param subject: Assunto do painel (seção MISCELLANEOUS do st.secrets).
+    """
+    Base = declarative_base()
+
+    class User(Base):
+        __tablename__ = f"users_{subject}"
+        id = Column(Integer, primary_key=True, autoincrement=True)
+        email = Column(String, unique=True, nullable=False)
+        name = Column(String, nullable=False)
+        enterprise = Column(String, nullable=False)
+        position = Column(String, nullable=False)
+        permission = Column(String, nullable=False)
+        exception = Column(String, nullable=False)
+        autorization = Column(String, nullable=False)
+        password = Column(String, nullable=False)
+
+        __table_args__ = (
+            # Filtros do diretório de usuários, já na ordem da paginação (e-mail)
+            Index(f"ix_users_{subject}_enterprise_email", "enterprise", "email"),
+            Index(f"ix_users_{subject}_position_email", "position", "email"),
+            Index(f"ix_users_{subject}_permission_email", "permission", "email"),
+            # Busca por prefixo sem diferenciar maiúsculas (text_pattern_ops permite LIKE 'x%' no PostgreSQL)
+            Index(
+                f"ix_users_{subject}_name_lower",
+                func.lower(name).label("name_lower"),
+                postgresql_ops={"name_lower": "text_pattern_ops"}
+            ),
+            Index(
+                f"ix_users_{subject}_email_lower",
+                func.lower(email).label("email_lower"),
+                postgresql_ops={"email_lower": "text_pattern_ops"}
+            ),
+        )
+
+    class AuditEvent(Base):
+        __tablename__ = f"audit_{subject}"
+        id = Column(Integer, primary_key=True, autoincrement=True)
+        created_at = Column(DateTime, nullable=False)
+        action = Column(String, nullable=False)
+        email = Column(String, nullable=False)
+        success = Column(Boolean, nullable=False)
+        session_id = Column(String)
+        detail = Column(String)
+
+        __table_args__ = (
+            Index(f"ix_audit_{subject}_email_created_at", "email", "created_at"),
+            Index(f"ix_audit_{subject}_created_at", "created_at"),
+        )
+
+    return Schema(Base, User, AuditEvent)
@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+class UserSnapshot(NamedTuple):
+    """Cópia imutável e leve de uma linha da tabela de usuários."""
+    id: int
+    email: str
+    name: str
+    enterprise: str
+    position: str
+    permission: str
+    exception: str
+    autorization: str
+    password: str
+
+    @classmethod
+    def from_row(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            enterprise=user.enterprise,
+            position=user.position,
+            permission=user.permission,
+            exception=user.exception,
+            autorization=user.autorization,
+            password=user.password
+        )
+
+class UserCache:
+    """Cache LRU com TTL de usuários, indexado pelo e-mail."""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, UserSnapshot]]" = OrderedDict()
+        self._lock = Lock()
+        # Contadores de desempenho
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, email: str) -> Optional[UserSnapshot]:
+        """Retorna o usuário em cache (ou None se ausente ou vencido)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, snapshot = entry
+            if expires_at < now:
+                del self._entries[email]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(email)
+            self.hits += 1
+            return snapshot
+
+    def put(self, snapshot: UserSnapshot) -> None:
+        """Armazena o usuário, descartando o menos usado se o cache estiver cheio."""
+        with self._lock:
+            self._entries[snapshot.email] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(snapshot.email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, email: str) -> None:
+        """Remove o usuário do cache (após cadastro, alteração ou exclusão)."""
+        with self._lock:
+            if self._entries.pop(email, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -1,115 +1,487 @@
 import streamlit as st
-from sqlalchemy import create_engine, Column, Integer, String
-from sqlalchemy.orm import declarative_base, sessionmaker
-import hashlib
-import re
-from user_login_panel.config.database import get_db_url
-
-Base = declarative_base()
-
-class User(Base):
-    __tablename__ = f"users_{st.secrets.MISCELLANEOUS.subject}"
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    email = Column(String, unique=True, nullable=False)
-    name = Column(String, nullable=False)
-    enterprise = Column(String, nullable=False)
-    position = Column(String, nullable=False)
-    permission = Column(String, nullable=False)
-    exception = Column(String, nullable=False)
-    autorization = Column(String, nullable=False)
-    password = Column(String, nullable=False)
-
-class UserModel:
-    def __init__(self):
-        self.engine = create_engine(get_db_url())
-        self.Session = sessionmaker(bind=self.engine)
-        Base.metadata.create_all(self.engine)
+from sqlalchemy import delete, distinct, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError, InterfaceError, OperationalError, SQLAlchemyError
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from threading import Lock
+from user_login_panel.config.database import DatabaseRegistry, get_db_url
+from user_login_panel.models.password_hasher import PasswordHasher
+from user_login_panel.models.schema import get_schema
+from user_login_panel.models.user_cache import UserCache, UserSnapshot
+from user_login_panel.utils.metrics import Metrics
+from user_login_panel.utils.user_io import ROW_ERROR, USER_FIELDS, chunked
+from user_login_panel.utils.validation import is_valid_email
+
+# Colunas exibidas no diretório de usuários e colunas que aceitam filtro exato
+DIRECTORY_FIELDS = ("email", "name", "enterprise", "position", "permission", "exception")
+DIRECTORY_FILTERS = ("enterprise", "position", "permission")
+
+# Campos do formulário de alteração mapeados para as colunas da tabela (a senha é tratada à parte)
+UPDATE_FIELDS = {
+    "name": "new_name",
+    "enterprise": "new_enterprise",
+    "position": "new_position",
+    "permission": "new_permission",
+    "exception": "new_exception",
+    "autorization": "autorization_code",
+}
+
+class UserModelBase:
+    """Partes do modelo de usuários que não fazem E/S: tabela, cache, hasher e montagem das instruções SQL.
+
+    Compartilhada pelo UserModel (síncrono) e pelo AsyncUserModel; cada um executa as
+    instruções na sua própria engine (self.engine).
+    """
+
+    # Caches de usuários compartilhados pelo processo, um por URL do banco
+    _caches: dict = {}
+    _caches_lock = Lock()
+    # Hasher de senhas compartilhado pelo processo
+    _hasher = None
+
+    def __init__(self, db_url=None, subject=None):
+        # Tabela definida aqui, e não na importação: users_<subject> do st.secrets (seção MISCELLANEOUS)
+        self.subject = subject or st.secrets.MISCELLANEOUS.subject
+        self.schema = get_schema(self.subject)
+        self.User = self.schema.User
+        self.db_url = db_url or get_db_url()
+        self.cache = self._get_cache(self.db_url)
+        self.hasher = self._get_hasher()
+
+    @classmethod
+    def _get_cache(cls, db_url):
+        cache = cls._caches.get(db_url)
+        if cache is None:
+            with cls._caches_lock:
+                if db_url not in cls._caches:
+                    # Seção opcional USER_CACHE do st.secrets
+                    settings = st.secrets.get("USER_CACHE", {})
+                    cls._caches[db_url] = UserCache(
+                        max_size=int(settings.get("max_size", 10000)),
+                        ttl=float(settings.get("ttl", 300))
+                    )
+                cache = cls._caches[db_url]
+        return cache
+
+    @classmethod
+    def _get_hasher(cls):
+        if UserModelBase._hasher is None:
+            with UserModelBase._caches_lock:
+                if UserModelBase._hasher is None:
+                    # Seção opcional PASSWORD_HASH do st.secrets (algoritmo, custo e workers)
+                    UserModelBase._hasher = PasswordHasher.from_settings(st.secrets.get("PASSWORD_HASH", {}))
+        return UserModelBase._hasher
+
+    def get_cache_stats(self):
+        return self.cache.stats()
+
+    def _select_user(self, email):
+        return select(*self.User.__table__.columns).where(self.User.email == email).limit(1)
+
+    def _rehash_stmt(self, user, hashed_password):
+        """UPDATE que troca a senha apenas se ela não mudou desde a leitura."""
+        return (
+            update(self.User)
+            .where(self.User.email == user.email, self.User.password == user.password)
+            .values(password=hashed_password)
+        )
+
+    def _insert_ignoring_conflict(self, values):
+        """Monta um INSERT ... ON CONFLICT (email) DO NOTHING, quando o dialeto suporta."""
+        dialect = self.engine.dialect.name
+
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            return None
+
+        return (
+            dialect_insert(self.User)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[self.User.email])
+        )
+
+    @staticmethod
+    def _register_values(inserted_data, hashed_password):
+        return {
+            "email": inserted_data["new_email"],
+            "name": inserted_data["new_name"],
+            "enterprise": inserted_data["new_enterprise"],
+            "position": inserted_data["new_position"],
+            "permission": inserted_data["new_permission"],
+            "exception": inserted_data["new_exception"],
+            "autorization": inserted_data["autorization_code"],
+            "password": hashed_password
+        }
+
+    def _update_stmt(self, email, values):
+        stmt = update(self.User).where(self.User.email == email).values(**values)
+        return stmt.returning(self.User.id) if self.engine.dialect.update_returning else stmt
+
+    def _delete_stmt(self, email):
+        stmt = delete(self.User).where(self.User.email == email)
+        return stmt.returning(self.User.id) if self.engine.dialect.delete_returning else stmt
+
+    def _validate_bulk_row(self, row):
+        """Retorna a mensagem de erro da linha importada (ou None se válida)."""
+        if not isinstance(row, dict):
+            return "A linha não é um objeto"
+        if row.get(ROW_ERROR):
+            return row[ROW_ERROR]
+        not_text = [field for field in USER_FIELDS if row.get(field) is not None and not isinstance(row[field], str)]
+        if not_text:
+            return f"Campos devem ser texto: {', '.join(not_text)}"
+        missing = [field for field in USER_FIELDS if field != "exception" and not row.get(field)]
+        if missing:
+            return f"Campos obrigatórios ausentes: {', '.join(missing)}"
+        if not self.is_valid_email(row["email"]):
+            return "E-mail inválido"
+        return None
+
+    def _split_bulk_chunk(self, chunk, row_number, report):
+        """
+        Valida um lote importado; registra os erros no relatório e retorna as linhas válidas numeradas.
+        :param row_number: Número da última linha de dados já lida (sem contar o cabeçalho do CSV).
+        :return: Tupla (lista de (número da linha, linha) válidas, número da última linha do lote).
+        """
+        valid = []
+        seen = set()
+        for row in chunk:
+            row_number += 1
+            error = self._validate_bulk_row(row)
+            if error:
+                report["failed"] += 1
+                email = row.get("email") if isinstance(row, dict) else None
+                report["errors"].append({"row": row_number, "email": email, "error": error})
+            elif row["email"] in seen:
+                # O INSERT ignoraria a repetição em silêncio: vale a primeira ocorrência do lote
+                report["skipped"] += 1
+                report["errors"].append({"row": row_number, "email": row["email"], "error": "E-mail repetido no arquivo"})
+            else:
+                seen.add(row["email"])
+                valid.append((row_number, row))
+        return valid, row_number
+
+    @staticmethod
+    def _bulk_values(valid, hashes):
+        return [
+            {field: (row.get(field) or "") for field in USER_FIELDS if field != "password"} | {"password": hashed}
+            for (_, row), hashed in zip(valid, hashes)
+        ]
+
+    def _bulk_stmt(self):
+        """INSERT em lote que retorna os e-mails inseridos, ou None sem ON CONFLICT no dialeto."""
+        stmt = self._insert_ignoring_conflict({})
+        if stmt is None:
+            return None
+        # executemany com ON CONFLICT DO NOTHING; retorna apenas as linhas inseridas
+        return stmt.returning(self.User.email, sort_by_parameter_order=True)
+
+    def _report_bulk_chunk(self, valid, inserted, report):
+        for row_number, row in valid:
+            if row["email"] in inserted:
+                report["inserted"] += 1
+                self.cache.invalidate(row["email"])
+            else:
+                report["skipped"] += 1
+                report["errors"].append({"row": row_number, "email": row["email"], "error": "Usuário já cadastrado"})
+
+    @staticmethod
+    def _report_bulk_failure(valid, exc, report):
+        report["failed"] += len(valid)
+        report["errors"].extend(
+            {"row": row_number, "email": row["email"], "error": str(exc)} for row_number, row in valid
+        )
+
+    def _export_stmt(self, include_password):
+        fields = [field for field in USER_FIELDS if include_password or field != "password"]
+        return select(*[getattr(self.User, field) for field in fields]).order_by(self.User.id)
+
+    @staticmethod
+    def _prefix_pattern(prefix):
+        """Padrão LIKE para o prefixo informado, escapando os curingas."""
+        escaped = prefix.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return escaped + "%"
+
+    def _list_users_stmt(self, search, enterprise, position, permission, after, limit):
+        stmt = select(*[getattr(self.User, field) for field in DIRECTORY_FIELDS])
+
+        for field, value in (("enterprise", enterprise), ("position", position), ("permission", permission)):
+            if value:
+                stmt = stmt.where(getattr(self.User, field) == value)
+
+        if search:
+            pattern = self._prefix_pattern(search.strip())
+            stmt = stmt.where(or_(
+                func.lower(self.User.name).like(pattern, escape="\\"),
+                func.lower(self.User.email).like(pattern, escape="\\")
+            ))
+
+        if after is not None:
+            # Continua a partir do último e-mail já exibido, sem OFFSET
+            stmt = stmt.where(self.User.email > after)
+
+        # Uma linha a mais indica se existe próxima página
+        return stmt.order_by(self.User.email).limit(limit + 1)
+
+    @staticmethod
+    def _page(rows, limit):
+        """Separa a página e o cursor da próxima (o e-mail da última linha exibida)."""
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, rows[-1]["email"]
+        return rows, None
+
+    def _directory_option_stmts(self):
+        for field in DIRECTORY_FILTERS:
+            column = getattr(self.User, field)
+            yield field, select(distinct(column)).order_by(column)
+
+    @staticmethod
+    def is_valid_email(email):
+        return is_valid_email(email)
+
+class UserModel(UserModelBase):
+    def __init__(self, db_url=None, subject=None, replica_urls=None):
+        super().__init__(db_url, subject)
+        # Engine, pool e fábrica de sessões são compartilhados por todo o processo
+        self.engine = DatabaseRegistry.get_engine(self.db_url)
+        self.Session = DatabaseRegistry.get_sessionmaker(self.db_url)
+        DatabaseRegistry.bootstrap(self.schema.Base.metadata, self.db_url)
+        # Leituras vão às réplicas de USER_DB.replicas (ou às informadas), se houver
+        self.router = DatabaseRegistry.get_router(self.db_url, replica_urls)
+
+    def get_pool_stats(self):
+        return DatabaseRegistry.get_pool_stats(self.db_url)
+
+    def get_replica_stats(self):
+        stats = self.router.stats()
+        for index, url in enumerate(self.router.replica_urls):
+            stats[f"replica_{index}"] = DatabaseRegistry.get_pool_stats(url)
+        return stats
+
+    @staticmethod
+    def _session_key():
+        """Identificador da sessão do Streamlit em execução (None fora de um script)."""
+        ctx = get_script_run_ctx(suppress_warning=True)
+        return ctx.session_id if ctx is not None else None
+
+    def _mark_write(self, *emails):
+        """Prende ao primário as próximas leituras desta sessão e dos e-mails alterados."""
+        self.router.mark_write(*(key for key in (self._session_key(), *emails) if key is not None))
+
+    def _read(self, operation, *emails):
+        """
+        Executa uma leitura em uma réplica (ou no primário), voltando ao primário se a réplica falhar.
+        :param operation: Função que recebe a conexão e retorna o resultado da leitura.
+        :param emails: E-mails envolvidos, para respeitar escritas recentes feitas por outras sessões.
+        """
+        url = self.router.choose(*(key for key in (self._session_key(), *emails) if key is not None))
+
+        if url != self.db_url:
+            try:
+                with self.router.engine(url).connect() as conn:
+                    return operation(conn)
+            except (OperationalError, InterfaceError):
+                self.router.mark_failed(url)
+
+        with self.engine.connect() as conn:
+            return operation(conn)
+
+    @Metrics.timed("user_model_get_user_seconds")
+    def get_user(self, email, fresh=False):
+        """
+        Obtém o usuário pelo e-mail, consultando o cache antes do banco.
+        :param fresh: Ignora o cache e lê do banco (o cache é por processo e não vê escritas de outras réplicas).
+        """
+        snapshot = None if fresh else self.cache.get(email)
+        if snapshot is not None:
+            return snapshot
+
+        row = self._read(lambda conn: conn.execute(self._select_user(email)).first(), email)
+
+        if row is None:
+            return None
+        snapshot = UserSnapshot.from_row(row)
+        self.cache.put(snapshot)
+        return snapshot
 
     def hash_password(self, password):
-        return hashlib.sha256(password.encode()).hexdigest()
+        return self.hasher.hash(password)
 
+    @Metrics.timed("user_model_check_email_seconds")
     def check_email(self, email):
-        session = self.Session()
-        
-        try:
-            return session.query(User).filter_by(email=email).first() is not None
-        finally:
-            session.close()
+        return self.get_user(email) is not None
 
+    @Metrics.timed("user_model_check_login_seconds")
     def check_login(self, email, password):
-        session = self.Session()
-        
-        try:
-            hashed_password = self.hash_password(password)
-            return session.query(User).filter_by(email=email, password=hashed_password).first() 
-        finally:
-            session.close()
+        # Busca pelo e-mail e verifica a senha fora do SQL (o hash tem sal). Sempre no banco: um usuário
+        # excluído ou com a senha trocada em outra réplica não pode entrar com o cadastro em cache
+        user = self.get_user(email, fresh=True)
+
+        if not self.hasher.verify(password, user.password if user else None):
+            return None
 
+        if self.hasher.needs_rehash(user.password):
+            self._rehash_password(user, password)
+
+        return user
+
+    def _rehash_password(self, user, password):
+        """Regrava a senha na versão atual do hash após um login bem-sucedido."""
+        stmt = self._rehash_stmt(user, self.hash_password(password))
+
+        with self.engine.begin() as conn:
+            conn.execute(stmt)
+
+        self._mark_write(user.email)
+        self.cache.invalidate(user.email)
+
+    @Metrics.timed("user_model_register_user_seconds")
     def register_user(self, inserted_data):
-        session = self.Session()
-        hashed_password = self.hash_password(inserted_data["new_password"])
-        
+        values = self._register_values(inserted_data, self.hash_password(inserted_data["new_password"]))
+        stmt = self._insert_ignoring_conflict(values)
+
         try:
-            if session.query(User).filter_by(email=inserted_data["new_email"]).first():
-                return False  # Usuário já cadastrado
-
-            new_user = User(
-                email=inserted_data["new_email"],
-                name=inserted_data["new_name"],
-                enterprise=inserted_data["new_enterprise"],
-                position=inserted_data["new_position"],
-                permission=inserted_data["new_permission"],
-                exception=inserted_data["new_exception"],
-                autorization=inserted_data["autorization_code"],
-                password=hashed_password
-            )
-            
-            session.add(new_user)
-            session.commit()            
-            return True  # Usuário cadastrado com sucesso
-        finally:
-            session.close()
-    
+            with self.engine.begin() as conn:
+                if stmt is not None:
+                    # Uma única ida ao banco; sem linha retornada = usuário já cadastrado
+                    created = conn.execute(stmt.returning(self.User.id)).first() is not None
+                else:
+                    conn.execute(insert(self.User).values(**values))
+                    created = True
+        except IntegrityError:
+            created = False  # Usuário já cadastrado (dialetos sem ON CONFLICT)
+
+        if created:
+            self._mark_write(inserted_data["new_email"])
+            self.cache.invalidate(inserted_data["new_email"])
+        return created
+
+    @Metrics.timed("user_model_update_user_seconds")
     def update_user(self, email, updated_data):
-        session = self.Session()
-        
-        try:
-            user = session.query(User).filter_by(email=email).first()
-            
-            if user:
-                user.name = updated_data.get("new_name", user.name)
-                user.enterprise = updated_data.get("new_enterprise", user.enterprise)
-                user.position = updated_data.get("new_position", user.position)
-                user.permission = updated_data.get("new_permission", user.permission)
-                user.exception = updated_data.get("new_exception", user.exception)
-                user.autorization = updated_data.get("autorization_code", user.autorization)
-                
-                if "new_password" in updated_data:
-                    user.password = self.hash_password(updated_data["new_password"])
-                
-                session.commit()                
-                return True
-            
-            return False
-        finally:
-            session.close()
+        values = {column: updated_data[key] for column, key in UPDATE_FIELDS.items() if key in updated_data}
+
+        if "new_password" in updated_data:
+            values["password"] = self.hash_password(updated_data["new_password"])
+
+        if not values:
+            # Nada a alterar: um UPDATE sem colunas é inválido, basta informar se o usuário existe
+            return self.check_email(email)
 
+        stmt = self._update_stmt(email, values)
+
+        with self.engine.begin() as conn:
+            result = conn.execute(stmt)
+            updated = result.first() is not None if result.returns_rows else result.rowcount > 0
+
+        if updated:
+            self._mark_write(email)
+            self.cache.invalidate(email)
+        return updated
+
+    @Metrics.timed("user_model_delete_user_seconds")
     def delete_user(self, email):
-        session = self.Session()
-        
-        try:
-            user = session.query(User).filter_by(email=email).first()
-            
-            if user:
-                session.delete(user)
-                session.commit()                
-                return True
-            
-            return False
-        finally:
-            session.close()
+        stmt = self._delete_stmt(email)
 
-    @staticmethod
-    def is_valid_email(email):
-        regex = r'^\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        return re.match(regex, email)
\ No newline at end of file
+        with self.engine.begin() as conn:
+            result = conn.execute(stmt)
+            deleted = result.first() is not None if result.returns_rows else result.rowcount > 0
+
+        if deleted:
+            self._mark_write(email)
+            self.cache.invalidate(email)
+        return deleted
+
+    def _insert_chunk(self, conn, values):
+        """Insere um lote e retorna o conjunto de e-mails efetivamente cadastrados."""
+        stmt = self._bulk_stmt()
+
+        if stmt is not None:
+            return {email for (email,) in conn.execute(stmt, values)}
+
+        inserted = set()
+        for row in values:
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(self.User).values(**row))
+                inserted.add(row["email"])
+            except IntegrityError:
+                pass
+        return inserted
+
+    @Metrics.timed("user_model_register_users_seconds")
+    def register_users(self, rows, chunk_size=500):
+        """
+        Cadastra usuários em massa, com commit por lote.
+        :param rows: Iterável de dicionários com as colunas de USER_FIELDS (senha em texto puro).
+        :param chunk_size: Número de linhas por lote/commit.
+        :return: Relatório com totais e a lista de erros por linha.
+        """
+        report = {"inserted": 0, "skipped": 0, "failed": 0, "errors": []}
+        row_number = 0
+
+        for chunk in chunked(rows, chunk_size):
+            valid, row_number = self._split_bulk_chunk(chunk, row_number, report)
+            if not valid:
+                continue
+
+            # Falha no hash ou no banco reprova apenas o lote, que entra no relatório
+            try:
+                # Hashes do lote em paralelo no pool do PasswordHasher (PASSWORD_HASH.workers)
+                hashes = self.hasher.hash_many(row["password"] for _, row in valid)
+                values = self._bulk_values(valid, hashes)
+                with self.engine.begin() as conn:
+                    inserted = self._insert_chunk(conn, values)
+            except (SQLAlchemyError, ValueError, TypeError) as exc:
+                self._report_bulk_failure(valid, exc, report)
+                continue
+
+            self._report_bulk_chunk(valid, inserted, report)
+            if inserted:
+                self._mark_write(*inserted)
+
+        return report
+
+    def export_users(self, chunk_size=1000, include_password=False):
+        """
+        Exporta os usuários em fluxo, lendo o banco em lotes.
+        :param chunk_size: Número de linhas lidas do banco por vez.
+        :param include_password: Inclui o hash da senha na exportação.
+        :return: Gerador de dicionários com as colunas de USER_FIELDS.
+        """
+        stmt = self._export_stmt(include_password)
+        # Leitura longa em fluxo: vai à réplica escolhida, sem troca para o primário no meio
+        engine = self.router.engine(self.router.choose())
+
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+            for partition in result.partitions():
+                for row in partition:
+                    yield dict(row._mapping)
+
+    @Metrics.timed("user_model_list_users_seconds")
+    def list_users(self, search=None, enterprise=None, position=None, permission=None, after=None, limit=50):
+        """
+        Lista uma página de usuários em ordem de e-mail, com paginação por cursor (keyset).
+        :param search: Prefixo do nome ou do e-mail (sem diferenciar maiúsculas).
+        :param enterprise: Filtro exato por empresa.
+        :param position: Filtro exato por cargo.
+        :param permission: Filtro exato por permissão.
+        :param after: Cursor retornado pela página anterior (None para a primeira página).
+        :param limit: Número máximo de usuários na página.
+        :return: Tupla (lista de dicionários com DIRECTORY_FIELDS, cursor da próxima página ou None).
+        """
+        stmt = self._list_users_stmt(search, enterprise, position, permission, after, limit)
+
+        rows = self._read(lambda conn: [dict(row._mapping) for row in conn.execute(stmt)])
+
+        return self._page(rows, limit)
+
+    @Metrics.timed("user_model_get_directory_options_seconds")
+    def get_directory_options(self):
+        """Valores distintos de cada coluna filtrável do diretório (servidos pelos índices)."""
+        return self._read(
+            lambda conn: {field: list(conn.execute(stmt).scalars()) for field, stmt in self._directory_option_stmts()}
+        )
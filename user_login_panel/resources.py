@@ -0,0 +1,121 @@
+import streamlit as st
+from user_login_panel.utils.metrics import Metrics
+from user_login_panel.utils.rate_limiter import LoginRateLimiter, SessionStoreStateStore
+from user_login_panel.utils.session_manager import SessionManager
+from user_login_panel.views.user_view import (
+    UserViewDirectory, UserViewHelper, UserViewMetrics, UserViewRegisterAndLogin, UserViewSidebar
+)
+
+# Recursos sem estado: construídos uma única vez por processo e compartilhados por todas as sessões.
+# Modelos, SQLAlchemy e drivers do banco são importados apenas na primeira autenticação: a tela de
+# login é exibida sem carregá-los.
+
+@st.cache_resource(show_spinner=False)
+def get_cached_db_url():
+    from user_login_panel.config.database import get_db_url
+    return get_db_url()
+
+@st.cache_resource(show_spinner=False)
+def get_miscellaneous():
+    """Lê a seção MISCELLANEOUS do st.secrets uma única vez."""
+    return dict(st.secrets.MISCELLANEOUS)
+
+@st.cache_data(show_spinner=False)
+def load_logo(image_path):
+    """Lê o arquivo do logotipo do disco uma única vez."""
+    with open(image_path, "rb") as image:
+        return image.read()
+
+@st.cache_resource(show_spinner=False)
+def setup_metrics():
+    """Configura as métricas (seção opcional METRICS) e registra as medidas instantâneas."""
+    Metrics.configure(st.secrets.get("METRICS", {}))
+    Metrics.register_collector("session_lock", SessionManager.get_lock_stats)
+    Metrics.register_collector("session", lambda: {"count": SessionManager.get_session_count()})
+    return Metrics
+
+@st.cache_resource(show_spinner=False)
+def get_user_model():
+    """Modelo de usuários: síncrono, ou assíncrono com fachada síncrona (seção opcional DB_ASYNC)."""
+    settings = st.secrets.get("DB_ASYNC", {})
+    if settings.get("enabled", False):
+        from user_login_panel.models.async_user_model import BridgedUserModel
+        model = BridgedUserModel.from_settings(settings, get_cached_db_url(), get_miscellaneous()["subject"])
+    else:
+        from user_login_panel.models.user_model import UserModel
+        model = UserModel(get_cached_db_url(), get_miscellaneous()["subject"])
+        if model.router.replica_urls:
+            Metrics.register_collector("db_replicas", model.get_replica_stats)
+    Metrics.register_collector("db_pool", model.get_pool_stats)
+    Metrics.register_collector("user_cache", model.get_cache_stats)
+    return model
+
+@st.cache_resource(show_spinner=False)
+def get_view_helper():
+    return UserViewHelper()
+
+@st.cache_resource(show_spinner=False)
+def get_view_register_login():
+    return UserViewRegisterAndLogin()
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limiter():
+    """Limitador de login (seção opcional RATE_LIMIT), com o estado no armazenamento de sessões."""
+    settings = st.secrets.get("RATE_LIMIT", {})
+    limiter = LoginRateLimiter.from_settings(
+        settings,
+        store=SessionStoreStateStore(SessionManager.get_store(), max_keys=settings.get("max_keys"))
+    )
+    Metrics.register_collector("rate_limit", limiter.stats)
+    return limiter
+
+@st.cache_resource(show_spinner=False)
+def get_audit_logger():
+    """Registrador de auditoria assíncrono (seção opcional AUDIT)."""
+    from user_login_panel.models.audit_model import AuditLogger
+    audit_logger = AuditLogger.from_settings(
+        st.secrets.get("AUDIT", {}), db_url=get_cached_db_url(), subject=get_miscellaneous()["subject"]
+    )
+    Metrics.register_collector("audit", audit_logger.stats)
+    return audit_logger
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_recent_events(email, start_date, end_date):
+    """Eventos de auditoria do usuário no período, renovados a cada minuto (ou pelo botão Atualizar)."""
+    return get_audit_logger().recent_events(email=email, start_date=start_date, end_date=end_date)
+
+@st.cache_resource(show_spinner=False)
+def get_view_metrics():
+    return UserViewMetrics()
+
+@st.cache_resource(show_spinner=False)
+def get_view_directory():
+    return UserViewDirectory()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_directory_options():
+    """Valores dos filtros do diretório de usuários, renovados a cada 5 minutos."""
+    return get_user_model().get_directory_options()
+
+# Recursos por sessão: construídos uma vez e guardados no st.session_state
+
+def get_user_controller():
+    """Obtém o controlador da sessão atual, criando-o apenas na primeira execução."""
+    controller = st.session_state.get("_user_controller")
+
+    if controller is None:
+        from user_login_panel.controllers.user_controller import UserController
+        # Modelo e auditoria são passados como fábricas: só são criados quando usados pela primeira vez
+        controller = UserController(
+            model_factory=get_user_model,
+            view_helper=get_view_helper(),
+            view_register_login=get_view_register_login(),
+            view_sidebar=UserViewSidebar(),
+            rate_limiter=get_rate_limiter(),
+            audit_logger_factory=get_audit_logger,
+            view_metrics=get_view_metrics(),
+            view_directory=get_view_directory()
+        )
+        st.session_state["_user_controller"] = controller
+
+    return controller
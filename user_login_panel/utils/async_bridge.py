@@ -0,0 +1,70 @@
+import asyncio
+import concurrent.futures
+from threading import Event, Lock, Thread
+from typing import Any, Awaitable, Optional
+from user_login_panel.utils.metrics import Metrics
+
+class AsyncBridge:
+    """Executa corrotinas em um laço de eventos compartilhado, rodando em uma thread em segundo plano.
+
+    As threads do Streamlit continuam síncronas: cada chamada envia a corrotina ao
+    laço e espera o resultado até o tempo limite. Estourado o limite, a tarefa é
+    cancelada no laço (liberando a conexão) e TimeoutError é lançado.
+    """
+
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _thread: Optional[Thread] = None
+    _lock = Lock()
+
+    @classmethod
+    def get_loop(cls) -> asyncio.AbstractEventLoop:
+        """Obtém (ou inicia uma única vez por processo) o laço de eventos compartilhado."""
+        loop = cls._loop
+        if loop is None:
+            with cls._lock:
+                if cls._loop is None:
+                    ready = Event()
+                    loop = asyncio.new_event_loop()
+
+                    def run():
+                        asyncio.set_event_loop(loop)
+                        loop.call_soon(ready.set)
+                        loop.run_forever()
+
+                    cls._thread = Thread(target=run, name="async-bridge", daemon=True)
+                    cls._thread.start()
+                    ready.wait()
+                    cls._loop = loop
+                loop = cls._loop
+        return loop
+
+    @classmethod
+    def submit(cls, coro: Awaitable) -> concurrent.futures.Future:
+        """Agenda a corrotina no laço compartilhado; o Future retornado pode ser cancelado pelo chamador."""
+        return asyncio.run_coroutine_threadsafe(coro, cls.get_loop())
+
+    @classmethod
+    def run(cls, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Executa a corrotina e aguarda o resultado, cancelando-a se exceder `timeout` segundos."""
+        future = cls.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            Metrics.inc("async_bridge_timeouts")
+            raise TimeoutError(f"A operação excedeu o tempo limite de {timeout} s")
+        except BaseException:
+            # Espera interrompida (ex.: KeyboardInterrupt): não deixa a tarefa órfã no laço
+            future.cancel()
+            raise
+
+    @classmethod
+    def stop(cls) -> None:
+        """Encerra o laço compartilhado (usado em testes e no encerramento do processo)."""
+        with cls._lock:
+            loop, thread = cls._loop, cls._thread
+            cls._loop = cls._thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            loop.close()
@@ -0,0 +1,249 @@
+import functools
+import inspect
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Callable, Dict, List, Optional
+
+class Histogram:
+    """Histograma de durações com buckets exponenciais fixos (em segundos)."""
+
+    BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    __slots__ = ("counts", "total", "count", "lock")
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.lock = Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.BUCKETS, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimativa do quantil pelo limite superior do bucket."""
+        with self.lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return 0.0
+        target = q * count
+        cumulative = 0
+        for bound, bucket_count in zip(self.BUCKETS + (float("inf"),), counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+class _NullTimer:
+    """Contexto vazio usado quando as métricas estão desligadas."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class Metrics:
+    """Registro global de contadores e histogramas dos caminhos críticos."""
+
+    # Liga/desliga toda a coleta (desligada, cada ponto instrumentado custa uma checagem de atributo)
+    enabled = True
+    _histograms: Dict[str, Histogram] = {}
+    _counters: Dict[str, float] = {}
+    # Funções que retornam medidas instantâneas (pool, cache, filas) no momento do snapshot
+    _collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+    _lock = Lock()
+    _null_timer = _NullTimer()
+    _server: Optional[ThreadingHTTPServer] = None
+
+    @classmethod
+    def configure(cls, settings) -> None:
+        """Aplica a seção opcional METRICS do st.secrets."""
+        cls.enabled = bool(settings.get("enabled", True))
+        if cls.enabled and settings.get("port"):
+            cls.serve(int(settings["port"]), settings.get("host", "127.0.0.1"))
+
+    @classmethod
+    def _histogram(cls, name: str) -> Histogram:
+        histogram = cls._histograms.get(name)
+        if histogram is None:
+            with cls._lock:
+                histogram = cls._histograms.setdefault(name, Histogram())
+        return histogram
+
+    @classmethod
+    def observe(cls, name: str, seconds: float) -> None:
+        if cls.enabled:
+            cls._histogram(name).observe(seconds)
+
+    @classmethod
+    def inc(cls, name: str, value: float = 1) -> None:
+        if cls.enabled:
+            with cls._lock:
+                cls._counters[name] = cls._counters.get(name, 0) + value
+
+    @classmethod
+    def timer(cls, name: str):
+        """Gerenciador de contexto que mede a duração do bloco."""
+        if not cls.enabled:
+            return cls._null_timer
+        return cls._timer(name)
+
+    @classmethod
+    @contextmanager
+    def _timer(cls, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls._histogram(name).observe(time.perf_counter() - start)
+
+    @classmethod
+    def timed(cls, name: str):
+        """Decorador que mede a duração de cada chamada da função (ou corrotina, até a conclusão)."""
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not cls.enabled:
+                        return await func(*args, **kwargs)
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        cls._histogram(name).observe(time.perf_counter() - start)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    cls._histogram(name).observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def register_collector(cls, name: str, collector: Callable[[], Dict[str, float]]) -> None:
+        with cls._lock:
+            cls._collectors[name] = collector
+
+    @classmethod
+    def instrument_engine(cls, engine) -> None:
+        """Mede cada instrução SQL executada pela engine (eventos do SQLAlchemy)."""
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            if cls.enabled:
+                conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get("metrics_start")
+            if starts:
+                elapsed = time.perf_counter() - starts.pop()
+                verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+                cls._histogram(f"db_statement_{verb}_seconds").observe(elapsed)
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Dict]:
+        """Retorna histogramas, contadores e medidas instantâneas atuais."""
+        with cls._lock:
+            histograms = dict(cls._histograms)
+            counters = dict(cls._counters)
+            collectors = dict(cls._collectors)
+
+        gauges: Dict[str, float] = {}
+        for prefix, collector in collectors.items():
+            for key, value in collector().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges[f"{prefix}_{key}"] = value
+
+        return {
+            "histograms": {
+                name: {
+                    "count": histogram.count,
+                    "sum": histogram.total,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                }
+                for name, histogram in sorted(histograms.items())
+            },
+            "counters": counters,
+            "gauges": gauges,
+        }
+
+    @classmethod
+    def to_prometheus(cls, prefix: str = "user_login_panel") -> str:
+        """Exporta as métricas no formato de texto do Prometheus."""
+        lines: List[str] = []
+
+        with cls._lock:
+            histograms = sorted(cls._histograms.items())
+            counters = sorted(cls._counters.items())
+
+        for name, histogram in histograms:
+            metric = f"{prefix}_{name}"
+            with histogram.lock:
+                counts, total, count = list(histogram.counts), histogram.total, histogram.count
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(Histogram.BUCKETS, counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {count}')
+            lines.append(f"{metric}_sum {total}")
+            lines.append(f"{metric}_count {count}")
+
+        for name, value in counters:
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            lines.append(f"{prefix}_{name} {value}")
+
+        for name, value in sorted(cls.snapshot()["gauges"].items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def serve(cls, port: int, host: str = "127.0.0.1") -> None:
+        """Expõe /metrics por HTTP em uma thread em segundo plano (uma vez por processo)."""
+        with cls._lock:
+            if cls._server is not None:
+                return
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = cls.to_prometheus().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            cls._server = ThreadingHTTPServer((host, port), Handler)
+            Thread(target=cls._server.serve_forever, name="metrics-server", daemon=True).start()
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._histograms.clear()
+            cls._counters.clear()
@@ -0,0 +1,86 @@
+import functools
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Separadores entre itens ("vendas, rh; financeiro") e entre níveis de um recurso ("vendas.relatorios", "vendas/relatorios")
+_ITEM_SEPARATORS = re.compile(r"[,;\n]+")
+_LEVEL_SEPARATORS = re.compile(r"[./:]+")
+# Chave reservada do nó da árvore com a decisão (True = permitido, False = negado)
+_DECISION = None
+
+def _segments(resource: str) -> List[str]:
+    """Normaliza um recurso em níveis: minúsculas, sem espaços e sem o curinga final."""
+    segments = [segment.strip() for segment in _LEVEL_SEPARATORS.split(resource.strip().lower())]
+    segments = [segment for segment in segments if segment]
+    if segments and segments[-1] == "*":
+        segments.pop()  # "vendas.*" equivale a "vendas" (o prefixo já cobre os subníveis)
+    return segments
+
+def _parse(text: Optional[str]) -> FrozenSet[str]:
+    """Separa o texto livre dos campos permission/exception em recursos normalizados."""
+    if not text:
+        return frozenset()
+    # "*" (todos os recursos) vira o prefixo vazio
+    return frozenset(".".join(_segments(item)) for item in _ITEM_SEPARATORS.split(text) if item.strip())
+
+class PermissionSet:
+    """Permissões de um usuário compiladas em uma árvore de prefixos imutável.
+
+    `permission` lista os recursos liberados e `exception` os recursos negados,
+    ambos como texto livre separado por vírgula, ponto e vírgula ou quebra de
+    linha. Um recurso libera (ou nega) também todos os seus subníveis, e vale a
+    regra mais específica; no mesmo nível, a exceção prevalece. "*" libera tudo.
+    """
+
+    # Máximo de decisões memorizadas por conjunto (o catálogo de recursos de um painel é pequeno)
+    MEMO_SIZE = 4096
+
+    __slots__ = ("source", "grants", "denies", "_root", "_memo")
+
+    def __init__(self, grants: Iterable[str], denies: Iterable[str], source: Tuple[Optional[str], Optional[str]] = (None, None)):
+        self.source = source
+        self.grants = frozenset(grants)
+        self.denies = frozenset(denies)
+        root: Dict = {}
+        for entries, decision in ((self.grants, True), (self.denies, False)):
+            for entry in entries:
+                node = root
+                for segment in entry.split(".") if entry else ():
+                    node = node.setdefault(segment, {})
+                # Negação gravada depois: prevalece sobre a permissão no mesmo nó
+                node[_DECISION] = decision
+        self._root = root
+        self._memo: Dict[str, bool] = {}
+
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def compile(cls, permission: Optional[str], exception: Optional[str]) -> "PermissionSet":
+        """Compila os campos permission/exception do usuário (reaproveitado entre usuários com os mesmos textos)."""
+        return cls(_parse(permission), _parse(exception), (permission, exception))
+
+    def is_allowed(self, resource: str) -> bool:
+        """Indica se o recurso é permitido: O(1) para recursos já consultados, senão proporcional aos níveis."""
+        decision = self._memo.get(resource)
+        if decision is None:
+            decision = self._evaluate(resource)
+            if len(self._memo) >= self.MEMO_SIZE:
+                self._memo.clear()
+            self._memo[resource] = decision
+        return decision
+
+    def _evaluate(self, resource: str) -> bool:
+        node = self._root
+        decision = node.get(_DECISION, False)
+        for segment in _segments(resource):
+            node = node.get(segment)
+            if node is None:
+                break
+            decision = node.get(_DECISION, decision)
+        return decision
+
+    def allowed(self, resources: Iterable[str]) -> List[str]:
+        """Filtra um catálogo de recursos, mantendo apenas os permitidos."""
+        return [resource for resource in resources if self.is_allowed(resource)]
+
+    def __repr__(self) -> str:
+        return f"PermissionSet(grants={sorted(self.grants)}, denies={sorted(self.denies)})"
@@ -0,0 +1,195 @@
+import math
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import ExitStack, nullcontext
+from threading import Lock
+from typing import ContextManager, Iterable, List, Optional, Tuple
+
+class LRUStateStore:
+    """Estado do limitador em memória, com número máximo de chaves (descarta a menos usada) e expiração preguiçosa."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._states: "OrderedDict[str, Tuple[List[float], float]]" = OrderedDict()
+        self._lock = Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._states.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self._states[key]
+                return None
+            self._states.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, state: List[float], ttl: float) -> None:
+        with self._lock:
+            self._states[key] = (state, time.time() + ttl)
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_keys:
+                self._states.popitem(last=False)
+                self.evictions += 1
+
+    def transaction(self) -> ContextManager[None]:
+        return nullcontext()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+class SessionStoreStateStore:
+    """Guarda o estado do limitador no mesmo armazenamento do SessionManager (memória ou SQLite compartilhado)."""
+
+    def __init__(self, session_store, max_keys: Optional[int] = None):
+        self.session_store = session_store
+        if max_keys:
+            session_store.set_limit_capacity(int(max_keys))
+
+    def get(self, key: str) -> Optional[List[float]]:
+        return self.session_store.get_limit_state(key)
+
+    def put(self, key: str, state: List[float], ttl: float) -> None:
+        self.session_store.put_limit_state(key, state, ttl)
+
+    def transaction(self) -> ContextManager[None]:
+        """Leituras e gravações de uma tentativa em uma transação do armazenamento (atômicas entre réplicas)."""
+        return self.session_store.limit_transaction()
+
+    def __len__(self) -> int:
+        return self.session_store.limit_state_count()
+
+class LoginRateLimiter:
+    """Limitador de tentativas de login por e-mail e por sessão.
+
+    Cada chave tem um token bucket (rajada de `capacity` tentativas, reposta a
+    `refill_rate` tentativas por segundo) e um contador de falhas consecutivas:
+    a partir de `free_failures` falhas, a chave é bloqueada por um tempo que
+    dobra a cada nova falha, até `max_delay` segundos. O contador de falhas só
+    é esquecido após `failure_window` segundos sem tentativas (padrão: o dobro
+    de `max_delay`), para que não expire junto com o bloqueio mais longo.
+    """
+
+    # Posições do estado de cada chave: [tokens, atualizado_em, falhas, bloqueado_até]
+    TOKENS, UPDATED, FAILURES, BLOCKED_UNTIL = range(4)
+    # Número de locks: cada chave usa o lock da sua faixa, e a E/S do armazenamento
+    # de uma chave não bloqueia os logins das demais
+    LOCK_STRIPES = 64
+
+    def __init__(self, capacity: int = 10, refill_rate: float = 10 / 60, free_failures: int = 3,
+                 base_delay: float = 1.0, max_delay: float = 300.0, failure_window: Optional[float] = None, store=None):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.free_failures = free_failures
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_window = failure_window if failure_window is not None else 2 * max_delay
+        # Maior expoente útil do bloqueio: além dele o atraso já é max_delay (e 2 ** n estouraria o float)
+        self._max_exponent = math.ceil(math.log2(max_delay / base_delay)) if 0 < base_delay < max_delay else 0
+        self.store = store if store is not None else LRUStateStore()
+        self._locks = [Lock() for _ in range(self.LOCK_STRIPES)]
+        self._stats_lock = Lock()
+        # Contadores de desempenho
+        self.allowed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_settings(cls, settings, store=None) -> "LoginRateLimiter":
+        """Cria o limitador a partir de um dicionário (ex.: seção RATE_LIMIT do st.secrets)."""
+        settings = dict(settings)
+        if store is None and "max_keys" in settings:
+            store = LRUStateStore(int(settings["max_keys"]))
+        return cls(
+            capacity=int(settings.get("capacity", 10)),
+            refill_rate=float(settings.get("refill_rate", 10 / 60)),
+            free_failures=int(settings.get("free_failures", 3)),
+            base_delay=float(settings.get("base_delay", 1.0)),
+            max_delay=float(settings.get("max_delay", 300.0)),
+            failure_window=float(settings["failure_window"]) if "failure_window" in settings else None,
+            store=store
+        )
+
+    @staticmethod
+    def keys(email: str, session_id: str) -> List[str]:
+        return [f"email:{email.strip().lower()}", f"session:{session_id}"]
+
+    def _locked(self, keys: List[str]) -> ExitStack:
+        """Adquire os locks das faixas das chaves, sempre em ordem crescente (sem deadlock entre chamadas)."""
+        stack = ExitStack()
+        for stripe in sorted({zlib.crc32(key.encode()) % self.LOCK_STRIPES for key in keys}):
+            stack.enter_context(self._locks[stripe])
+        return stack
+
+    def _ttl(self) -> float:
+        # Tempo até o bucket encher de novo ou a janela de falhas vencer (sempre além do maior bloqueio)
+        refill = self.capacity / self.refill_rate if self.refill_rate else 0.0
+        return max(refill, self.failure_window, self.max_delay)
+
+    def _load(self, key: str, now: float) -> List[float]:
+        state = self.store.get(key)
+        if state is None:
+            return [float(self.capacity), now, 0, 0.0]
+        state = list(state)
+        # Reposição preguiçosa dos tokens desde a última atualização
+        elapsed = max(now - state[self.UPDATED], 0.0)
+        state[self.TOKENS] = min(self.capacity, state[self.TOKENS] + elapsed * self.refill_rate)
+        state[self.UPDATED] = now
+        return state
+
+    def check(self, keys: Iterable[str], now: Optional[float] = None) -> float:
+        """Consome uma tentativa de cada chave; retorna 0 se permitido ou os segundos até a próxima tentativa."""
+        now = time.time() if now is None else now
+        keys = list(keys)
+
+        with self._locked(keys), self.store.transaction():
+            states = [self._load(key, now) for key in keys]
+            retry_after = 0.0
+            for state in states:
+                if state[self.BLOCKED_UNTIL] > now:
+                    retry_after = max(retry_after, state[self.BLOCKED_UNTIL] - now)
+                if state[self.TOKENS] < 1:
+                    retry_after = max(retry_after, (1 - state[self.TOKENS]) / self.refill_rate if self.refill_rate else math.inf)
+
+            if retry_after <= 0:
+                for key, state in zip(keys, states):
+                    state[self.TOKENS] -= 1
+                    self.store.put(key, state, self._ttl())
+
+        with self._stats_lock:
+            if retry_after > 0:
+                self.rejected += 1
+            else:
+                self.allowed += 1
+        return retry_after
+
+    def record_failure(self, keys: Iterable[str], now: Optional[float] = None) -> None:
+        """Registra uma falha de login e aplica o bloqueio progressivo."""
+        now = time.time() if now is None else now
+        keys = list(keys)
+
+        with self._locked(keys), self.store.transaction():
+            for key in keys:
+                state = self._load(key, now)
+                state[self.FAILURES] += 1
+                excess = state[self.FAILURES] - self.free_failures
+                if excess >= 0:
+                    delay = min(self.base_delay * (2 ** min(excess, self._max_exponent)), self.max_delay)
+                    state[self.BLOCKED_UNTIL] = now + delay
+                self.store.put(key, state, self._ttl())
+
+    def record_success(self, keys: Iterable[str], now: Optional[float] = None) -> None:
+        """Zera as falhas consecutivas após um login bem-sucedido."""
+        now = time.time() if now is None else now
+        keys = list(keys)
+
+        with self._locked(keys), self.store.transaction():
+            for key in keys:
+                state = self._load(key, now)
+                state[self.FAILURES] = 0
+                state[self.BLOCKED_UNTIL] = 0.0
+                self.store.put(key, state, self._ttl())
+
+    def stats(self):
+        return {"allowed": self.allowed, "rejected": self.rejected, "keys": len(self.store) if hasattr(self.store, "__len__") else None}
@@ -0,0 +1,60 @@
+import heapq
+from typing import Dict, List, Tuple
+
+class ExpiryHeap:
+    """Fila de expiração baseada em min-heap com remoção preguiçosa.
+
+    Cada acesso apenas empilha um novo prazo; entradas obsoletas são
+    descartadas quando chegam ao topo. A limpeza toca somente as sessões
+    que realmente venceram (O(log N) amortizado por sessão).
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        # Prazo vigente de cada sessão
+        self._deadlines: Dict[str, float] = {}
+        # Heap de (prazo, session_id), possivelmente com entradas obsoletas
+        self._heap: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._deadlines
+
+    def touch(self, session_id: str, now: float) -> None:
+        """Registra um acesso e renova o prazo da sessão."""
+        deadline = now + self.timeout
+        self._deadlines[session_id] = deadline
+        heapq.heappush(self._heap, (deadline, session_id))
+
+        # Compacta o heap quando as entradas obsoletas dominam
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._compact()
+
+    def last_access(self, session_id: str) -> float:
+        """Retorna o timestamp do último acesso registrado."""
+        return self._deadlines[session_id] - self.timeout
+
+    def discard(self, session_id: str) -> None:
+        """Remove a sessão da fila (a entrada no heap é ignorada depois)."""
+        self._deadlines.pop(session_id, None)
+
+    def pop_expired(self, now: float) -> List[str]:
+        """Remove e retorna as sessões cujo prazo já venceu."""
+        expired = []
+        heap = self._heap
+        while heap and heap[0][0] < now:
+            deadline, session_id = heapq.heappop(heap)
+            if self._deadlines.get(session_id) == deadline:
+                del self._deadlines[session_id]
+                expired.append(session_id)
+        return expired
+
+    def next_deadline(self) -> float:
+        """Retorna o próximo prazo no topo do heap (ou infinito se vazio)."""
+        return self._heap[0][0] if self._heap else float("inf")
+
+    def _compact(self) -> None:
+        self._heap = [(deadline, sid) for sid, deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
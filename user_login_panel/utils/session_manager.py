@@ -2,43 +2,154 @@ import streamlit as st
 import uuid
 import time
 from typing import Any, Dict, Optional
-from threading import Lock
+from threading import Event, Lock, Thread, local
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from user_login_panel.utils.metrics import Metrics
+from user_login_panel.utils.permissions import PermissionSet
+from user_login_panel.utils.session_record import SessionRecord
+from user_login_panel.utils.session_store import SessionStore, ShardedSessionStore
 
 class SessionManager:
-    # Dicionário global para armazenar todas as sessões
-    _sessions: Dict[str, Dict[str, Any]] = {}
-    # Dicionário para armazenar o último acesso de cada sessão
-    _last_access: Dict[str, float] = {}
     # Tempo de expiração da sessão em segundos (1 hora)
     SESSION_TIMEOUT = 3600
-    # Lock para operações thread-safe
+    # Número de fatias (cada uma com seu próprio lock) do armazenamento de sessões
+    SHARD_COUNT = 16
+    # Intervalo mínimo (segundos) entre duas gravações do último acesso de uma mesma sessão
+    TOUCH_GRANULARITY = 1.0
+    # Armazenamento global de todas as sessões e de seus últimos acessos (em memória por padrão)
+    _store: SessionStore = ShardedSessionStore(SESSION_TIMEOUT, SHARD_COUNT)
+    _configured = False
+    # Lock para o controle da thread de limpeza
     _lock = Lock()
+    # Thread opcional que remove sessões expiradas em segundo plano
+    _reaper: Optional[Thread] = None
+    _reaper_stop = Event()
+    # ID da sessão já resolvido pela thread do script (uma thread por execução no Streamlit)
+    _run_cache = local()
+
+    @classmethod
+    def set_store(cls, store: SessionStore) -> None:
+        """Substitui o armazenamento de sessões (ex.: por um compartilhado entre réplicas)."""
+        with cls._lock:
+            previous, cls._store = cls._store, store
+            cls._configured = True
+        if previous is not store:
+            previous.close()
+
+    @classmethod
+    def get_store(cls) -> SessionStore:
+        """Retorna o armazenamento de sessões em uso."""
+        cls.configure()
+        return cls._store
+
+    @classmethod
+    def configure(cls) -> None:
+        """Configura o armazenamento a partir da seção opcional SESSION do st.secrets."""
+        if cls._configured:
+            return
+
+        settings = st.secrets.get("SESSION", {})
+        cls.TOUCH_GRANULARITY = float(settings.get("touch_granularity", cls.TOUCH_GRANULARITY))
+        backend = settings.get("backend", "memory")
+        if backend == "sqlite":
+            from user_login_panel.utils.sqlite_session_store import SQLiteSessionStore
+            store = SQLiteSessionStore(
+                settings.get("path", "sessions.db"),
+                cls.SESSION_TIMEOUT,
+                flush_interval=float(settings.get("flush_interval", 5.0)),
+                flush_size=int(settings.get("flush_size", 256)),
+            )
+            cls.set_store(store)
+        elif backend == "memory":
+            cls._configured = True
+        else:
+            raise ValueError(f"Backend de sessão desconhecido: {backend}")
+
+        # Limpeza em segundo plano (opcional): sem ela, as sessões expiradas são removidas no caminho da requisição
+        reaper_interval = float(settings.get("reaper_interval", 0))
+        if reaper_interval > 0:
+            cls.start_reaper(reaper_interval)
 
     @classmethod
     def _cleanup_expired_sessions(cls) -> None:
         """Remove sessões expiradas."""
-        current_time = time.time()
-        expired_sessions = [
-            session_id for session_id, last_access in cls._last_access.items()
-            if current_time - last_access > cls.SESSION_TIMEOUT
-        ]
-        
-        with cls._lock:
-            for session_id in expired_sessions:
-                cls._sessions.pop(session_id, None)
-                cls._last_access.pop(session_id, None)
+        cls._store.cleanup(time.time())
 
     @classmethod
-    def _update_last_access(cls, session_id: str) -> None:
+    def _update_last_access(cls, session_id: str, now: Optional[float] = None) -> None:
         """Atualiza o timestamp do último acesso da sessão."""
+        now = time.time() if now is None else now
+        cls._store.touch(session_id, now)
+        cls._remember_touch(session_id, now)
+
+    @classmethod
+    def _run_key(cls) -> Optional[str]:
+        """Identifica a sessão do Streamlit atendida pela thread (None fora do `streamlit run`)."""
+        ctx = get_script_run_ctx(suppress_warning=True)
+        return ctx.session_id if ctx is not None else None
+
+    @classmethod
+    def _remember_touch(cls, session_id: str, now: float) -> None:
+        cached = getattr(cls._run_cache, "entry", None)
+        if cached is not None and cached[1] == session_id:
+            cls._run_cache.entry = (cached[0], session_id, now)
+
+    @classmethod
+    def get_lock_stats(cls) -> Dict[str, Any]:
+        """Retorna as métricas de contenção dos locks das sessões."""
+        return cls._store.lock_stats()
+
+    @classmethod
+    def start_reaper(cls, interval: float = 60.0) -> None:
+        """Inicia a thread que remove sessões expiradas fora do caminho da requisição."""
         with cls._lock:
-            cls._last_access[session_id] = time.time()
+            if cls._reaper_active():
+                return
+            cls._reaper_stop = Event()
+            cls._reaper = Thread(
+                target=cls._reap_loop,
+                args=(interval, cls._reaper_stop),
+                name="session-reaper",
+                daemon=True
+            )
+            cls._reaper.start()
+
+    @classmethod
+    def stop_reaper(cls) -> None:
+        """Interrompe a thread de limpeza, se estiver ativa."""
+        reaper = cls._reaper
+        cls._reaper_stop.set()
+        if reaper is not None:
+            reaper.join()
+        cls._reaper = None
 
     @classmethod
+    def _reap_loop(cls, interval: float, stop: Event) -> None:
+        while not stop.wait(interval):
+            cls._cleanup_expired_sessions()
+
+    @classmethod
+    def _reaper_active(cls) -> bool:
+        return cls._reaper is not None and cls._reaper.is_alive()
+
+    @classmethod
+    @Metrics.timed("session_get_id_seconds")
     def get_session_id(cls) -> str:
         """Obtém ou cria um ID de sessão único para a aba atual."""
-        # Limpa sessões expiradas antes de criar/obter uma nova
-        cls._cleanup_expired_sessions()
+        # Após a primeira chamada da execução, o ID vem da memória da thread e o último acesso
+        # só é gravado de novo depois de TOUCH_GRANULARITY segundos
+        run_key = cls._run_key()
+        cached = getattr(cls._run_cache, "entry", None)
+        if cached is not None and cached[0] == run_key:
+            _, session_id, last_touch = cached
+            now = time.time()
+            if now - last_touch >= cls.TOUCH_GRANULARITY:
+                cls._update_last_access(session_id, now)
+            return session_id
+
+        # Limpa sessões expiradas antes de criar/obter uma nova (a thread de limpeza dispensa esse passo)
+        if not cls._reaper_active():
+            cls._cleanup_expired_sessions()
 
         if "session_id" not in st.session_state:
             if "session_id" in st.query_params:
@@ -47,55 +158,71 @@ class SessionManager:
                 session_id = str(uuid.uuid4())
                 st.query_params["session_id"] = session_id
             st.session_state["session_id"] = session_id
-            
+
             # Inicializa o estado da sessão se não existir
-            with cls._lock:
-                if session_id not in cls._sessions:
-                    cls._sessions[session_id] = {}
-                    cls._last_access[session_id] = time.time()
-        
+            cls._store.ensure(session_id, time.time())
+
+        session_id = st.session_state["session_id"]
         # Atualiza o timestamp do último acesso
-        cls._update_last_access(st.session_state["session_id"])
-        return st.session_state["session_id"]
+        now = time.time()
+        cls._store.touch(session_id, now)
+        cls._run_cache.entry = (run_key, session_id, now)
+        return session_id
 
     @classmethod
     def get_session_state(cls, key: str, default: Any = None) -> Any:
         """Obtém um valor do estado da sessão atual."""
-        session_id = cls.get_session_id()
-        with cls._lock:
-            if session_id not in cls._sessions:
-                cls._sessions[session_id] = {}
-            return cls._sessions[session_id].get(key, default)
+        # Leitura pura: sem registro, o armazenamento já retorna o padrão
+        return cls._store.get(cls.get_session_id(), key, default)
 
     @classmethod
     def set_session_state(cls, key: str, value: Any) -> None:
         """Define um valor no estado da sessão atual."""
         session_id = cls.get_session_id()
-        with cls._lock:
-            if session_id not in cls._sessions:
-                cls._sessions[session_id] = {}
-            cls._sessions[session_id][key] = value
-            cls._last_access[session_id] = time.time()
+        now = time.time()
+        cls._store.set(session_id, key, value, now)
+        cls._remember_touch(session_id, now)
+
+    @classmethod
+    def update_session_state(cls, values: Dict[str, Any]) -> None:
+        """Define vários valores no estado da sessão atual de uma só vez."""
+        session_id = cls.get_session_id()
+        now = time.time()
+        cls._store.update(session_id, values, now)
+        cls._remember_touch(session_id, now)
+
+    @classmethod
+    def get_session_record(cls) -> SessionRecord:
+        """Obtém o registro completo da sessão atual."""
+        return cls._store.get_record(cls.get_session_id()) or SessionRecord(time.time())
+
+    @classmethod
+    def get_permissions(cls) -> PermissionSet:
+        """Obtém as permissões compiladas da sessão atual, compilando-as só quando permission/exception mudam."""
+        record = cls.get_session_record()
+        source = (record.permission, record.exception)
+        access = record.access
+        if access is None or access.source != source:
+            access = PermissionSet.compile(*source)
+            record.access = access
+        return access
 
     @classmethod
     def clear_session(cls) -> None:
         """Limpa o estado da sessão atual."""
         session_id = cls.get_session_id()
-        with cls._lock:
-            if session_id in cls._sessions:
-                cls._sessions[session_id] = {}
-                cls._last_access[session_id] = time.time()
+        cls._store.clear(session_id, time.time())
 
     @classmethod
     def get_all_sessions(cls) -> Dict[str, Dict[str, Any]]:
         """Retorna uma cópia de todas as sessões ativas."""
-        cls._cleanup_expired_sessions()
-        with cls._lock:
-            return cls._sessions.copy()
+        if not cls._reaper_active():
+            cls._cleanup_expired_sessions()
+        return cls._store.snapshot()
 
     @classmethod
     def get_session_count(cls) -> int:
         """Retorna o número de sessões ativas."""
-        cls._cleanup_expired_sessions()
-        with cls._lock:
-            return len(cls._sessions) 
\ No newline at end of file
+        if not cls._reaper_active():
+            cls._cleanup_expired_sessions()
+        return cls._store.count()
\ No newline at end of file
@@ -0,0 +1,81 @@
+from typing import Any, Dict, Optional
+
+class SessionRecord:
+    """Registro compacto com todo o estado de login de uma sessão."""
+
+    __slots__ = ("email", "user", "permission", "exception", "logged_in", "page", "created_at", "last_access", "extra", "access")
+
+    # Chaves do estado da sessão mapeadas diretamente para atributos do registro
+    FIELDS = {
+        "email": "email",
+        "user": "user",
+        "permission": "permission",
+        "exception": "exception",
+        "logged_in": "logged_in",
+        "current_page": "page",
+        "page": "page",
+    }
+
+    def __init__(self, now: float):
+        self.email: Optional[str] = None
+        self.user: Optional[str] = None
+        self.permission: Optional[str] = None
+        self.exception: Optional[str] = None
+        self.logged_in = False
+        self.page = "login"
+        self.created_at = now
+        self.last_access = now
+        # Demais chaves (raras) ficam em um dicionário criado sob demanda
+        self.extra: Optional[Dict[str, Any]] = None
+        # Permissões compiladas (PermissionSet), mantidas apenas em memória e nunca serializadas
+        self.access = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Lê um valor pelo nome da chave do estado da sessão."""
+        field = self.FIELDS.get(key)
+        if field is not None:
+            value = getattr(self, field)
+            return default if value is None else value
+        if self.extra is None:
+            return default
+        return self.extra.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        """Define um valor pelo nome da chave do estado da sessão."""
+        field = self.FIELDS.get(key)
+        if field is not None:
+            setattr(self, field, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa o registro (ex.: para armazenamentos externos)."""
+        data = {
+            "email": self.email,
+            "user": self.user,
+            "permission": self.permission,
+            "exception": self.exception,
+            "logged_in": self.logged_in,
+            "page": self.page,
+            "created_at": self.created_at,
+            "last_access": self.last_access,
+        }
+        if self.extra:
+            data["extra"] = dict(self.extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SessionRecord":
+        """Reconstrói um registro serializado por to_dict."""
+        record = cls(data.get("created_at", 0.0))
+        record.email = data.get("email")
+        record.user = data.get("user")
+        record.permission = data.get("permission")
+        record.exception = data.get("exception")
+        record.logged_in = data.get("logged_in", False)
+        record.page = data.get("page", "login")
+        record.last_access = data.get("last_access", record.created_at)
+        record.extra = data.get("extra") or None
+        return record
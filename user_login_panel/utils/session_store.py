@@ -0,0 +1,279 @@
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, List, Optional, Tuple
+from threading import Lock
+from user_login_panel.utils.metrics import Metrics
+from user_login_panel.utils.session_expiry import ExpiryHeap
+from user_login_panel.utils.session_record import SessionRecord
+
+class SessionStore(ABC):
+    """Interface dos armazenamentos de sessão usados pelo SessionManager."""
+
+    @abstractmethod
+    def get(self, session_id: str, key: str, default: Any = None) -> Any:
+        """Lê um valor da sessão."""
+
+    @abstractmethod
+    def get_record(self, session_id: str) -> Optional[SessionRecord]:
+        """Retorna o registro da sessão (ou None se não existir)."""
+
+    @abstractmethod
+    def contains(self, session_id: str) -> bool:
+        """Indica se a sessão existe."""
+
+    @abstractmethod
+    def ensure(self, session_id: str, now: float) -> None:
+        """Cria a sessão caso ainda não exista."""
+
+    @abstractmethod
+    def touch(self, session_id: str, now: float) -> None:
+        """Atualiza o último acesso da sessão."""
+
+    @abstractmethod
+    def set(self, session_id: str, key: str, value: Any, now: float) -> None:
+        """Define um valor na sessão e renova o último acesso."""
+
+    @abstractmethod
+    def update(self, session_id: str, values: Dict[str, Any], now: float) -> None:
+        """Define vários valores da sessão de uma só vez."""
+
+    @abstractmethod
+    def clear(self, session_id: str, now: float) -> None:
+        """Esvazia o estado da sessão, se existir."""
+
+    @abstractmethod
+    def cleanup(self, now: float) -> int:
+        """Remove as sessões expiradas e retorna quantas foram removidas."""
+
+    @abstractmethod
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna uma cópia de todas as sessões."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Retorna o número de sessões."""
+
+    def lock_stats(self) -> Dict[str, Any]:
+        """Retorna métricas de contenção (quando o armazenamento as possui)."""
+        return {}
+
+    # Estado do limitador de login, guardado junto das sessões (compartilhado quando o armazenamento é)
+
+    @abstractmethod
+    def get_limit_state(self, key: str) -> Optional[List[float]]:
+        """Lê o estado do limitador de tentativas da chave (None se ausente ou expirado)."""
+
+    @abstractmethod
+    def put_limit_state(self, key: str, state: List[float], ttl: float) -> None:
+        """Grava o estado do limitador de tentativas da chave, com expiração."""
+
+    @abstractmethod
+    def limit_state_count(self) -> int:
+        """Retorna o número de chaves do limitador guardadas."""
+
+    def set_limit_capacity(self, max_keys: int) -> None:
+        """Limita o número de chaves do limitador (armazenamentos que expiram só por TTL ignoram)."""
+
+    def limit_transaction(self) -> ContextManager[None]:
+        """Torna atômicas as leituras e gravações do limitador feitas dentro do bloco.
+
+        Em memória os locks do próprio limitador bastam; armazenamentos compartilhados
+        entre processos precisam de uma transação.
+        """
+        return nullcontext()
+
+    def close(self) -> None:
+        """Libera os recursos do armazenamento."""
+
+class SessionShard:
+    """Fatia do armazenamento de sessões, protegida por um lock próprio."""
+
+    __slots__ = ("lock", "sessions", "expiry", "acquisitions", "contended", "wait_total", "wait_max")
+
+    def __init__(self, timeout: float):
+        self.lock = Lock()
+        self.sessions: Dict[str, SessionRecord] = {}
+        self.expiry = ExpiryHeap(timeout)
+        # Métricas de contenção do lock
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def __enter__(self) -> "SessionShard":
+        if not self.lock.acquire(blocking=False):
+            # Lock ocupado: mede quanto tempo a thread espera
+            start = time.perf_counter()
+            self.lock.acquire()
+            waited = time.perf_counter() - start
+            self.contended += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+            Metrics.observe("session_lock_wait_seconds", waited)
+        self.acquisitions += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.lock.release()
+
+class ShardedSessionStore(SessionStore):
+    """Armazenamento em memória (padrão), particionado em N fatias pelo hash do session_id.
+
+    Escritas travam apenas a fatia da sessão; leituras não usam lock, pois
+    consultas simples a dicionários são atômicas no CPython.
+    """
+
+    def __init__(self, timeout: float, shard_count: int = 16, limit_max_keys: int = 100000):
+        self.timeout = timeout
+        self.shards = [SessionShard(timeout) for _ in range(shard_count)]
+        # Estado do limitador de login: LRU limitada a limit_max_keys, com expiração preguiçosa
+        self.limit_max_keys = limit_max_keys
+        self.limit_evictions = 0
+        self._limit_states: "OrderedDict[str, Tuple[List[float], float]]" = OrderedDict()
+        self._limit_lock = Lock()
+
+    def _shard(self, session_id: str) -> SessionShard:
+        return self.shards[zlib.crc32(session_id.encode()) % len(self.shards)]
+
+    def get(self, session_id: str, key: str, default: Any = None) -> Any:
+        """Lê um valor da sessão sem adquirir lock."""
+        record = self._shard(session_id).sessions.get(session_id)
+        if record is None:
+            return default
+        return record.get(key, default)
+
+    def get_record(self, session_id: str) -> Optional[SessionRecord]:
+        return self._shard(session_id).sessions.get(session_id)
+
+    def contains(self, session_id: str) -> bool:
+        return session_id in self._shard(session_id).sessions
+
+    def ensure(self, session_id: str, now: float) -> None:
+        """Cria a sessão caso ainda não exista."""
+        shard = self._shard(session_id)
+        if session_id in shard.sessions:
+            return
+        with shard:
+            if session_id not in shard.sessions:
+                shard.sessions[session_id] = SessionRecord(now)
+                shard.expiry.touch(session_id, now)
+
+    def touch(self, session_id: str, now: float) -> None:
+        """Atualiza o último acesso da sessão, se existir (sessão ausente não entra no heap de expiração)."""
+        shard = self._shard(session_id)
+        with shard:
+            record = shard.sessions.get(session_id)
+            if record is not None:
+                record.last_access = now
+                shard.expiry.touch(session_id, now)
+
+    def set(self, session_id: str, key: str, value: Any, now: float) -> None:
+        """Define um valor na sessão e renova o último acesso."""
+        shard = self._shard(session_id)
+        with shard:
+            record = self._record_for_write(shard, session_id, now)
+            record.set(key, value)
+            record.last_access = now
+            shard.expiry.touch(session_id, now)
+
+    def update(self, session_id: str, values: Dict[str, Any], now: float) -> None:
+        shard = self._shard(session_id)
+        with shard:
+            record = self._record_for_write(shard, session_id, now)
+            for key, value in values.items():
+                record.set(key, value)
+            record.last_access = now
+            shard.expiry.touch(session_id, now)
+
+    @staticmethod
+    def _record_for_write(shard: SessionShard, session_id: str, now: float) -> SessionRecord:
+        record = shard.sessions.get(session_id)
+        if record is None:
+            record = shard.sessions[session_id] = SessionRecord(now)
+        return record
+
+    def clear(self, session_id: str, now: float) -> None:
+        """Esvazia o estado da sessão, se existir."""
+        shard = self._shard(session_id)
+        with shard:
+            if session_id in shard.sessions:
+                shard.sessions[session_id] = SessionRecord(now)
+                shard.expiry.touch(session_id, now)
+
+    def cleanup(self, now: float) -> int:
+        """Remove as sessões expiradas de todas as fatias."""
+        removed = 0
+        for shard in self.shards:
+            # Verificação rápida sem lock: nenhuma sessão da fatia venceu
+            if shard.expiry.next_deadline() >= now:
+                continue
+            with shard:
+                for session_id in shard.expiry.pop_expired(now):
+                    if shard.sessions.pop(session_id, None) is not None:
+                        removed += 1
+        return removed
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna uma cópia de todas as sessões."""
+        result: Dict[str, Dict[str, Any]] = {}
+        for shard in self.shards:
+            with shard:
+                for session_id, record in shard.sessions.items():
+                    result[session_id] = record.to_dict()
+        return result
+
+    def count(self) -> int:
+        return sum(len(shard.sessions) for shard in self.shards)
+
+    def get_limit_state(self, key: str) -> Optional[List[float]]:
+        with self._limit_lock:
+            entry = self._limit_states.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self._limit_states[key]
+                return None
+            self._limit_states.move_to_end(key)
+            return entry[0]
+
+    def put_limit_state(self, key: str, state: List[float], ttl: float) -> None:
+        with self._limit_lock:
+            self._limit_states[key] = (state, time.time() + ttl)
+            self._limit_states.move_to_end(key)
+            while len(self._limit_states) > self.limit_max_keys:
+                self._limit_states.popitem(last=False)
+                self.limit_evictions += 1
+
+    def limit_state_count(self) -> int:
+        return len(self._limit_states)
+
+    def set_limit_capacity(self, max_keys: int) -> None:
+        with self._limit_lock:
+            self.limit_max_keys = max_keys
+
+    def lock_stats(self) -> Dict[str, Any]:
+        """Agrega as métricas de contenção de todas as fatias."""
+        per_shard: List[Dict[str, Any]] = []
+        for shard in self.shards:
+            per_shard.append({
+                "acquisitions": shard.acquisitions,
+                "contended": shard.contended,
+                "wait_total": shard.wait_total,
+                "wait_max": shard.wait_max,
+            })
+        acquisitions = sum(s["acquisitions"] for s in per_shard)
+        contended = sum(s["contended"] for s in per_shard)
+        wait_total = sum(s["wait_total"] for s in per_shard)
+        return {
+            "shards": len(self.shards),
+            "acquisitions": acquisitions,
+            "contended": contended,
+            "contention_ratio": contended / acquisitions if acquisitions else 0.0,
+            "wait_total": wait_total,
+            "wait_max": max(s["wait_max"] for s in per_shard),
+            "per_shard": per_shard,
+        }
@@ -0,0 +1,217 @@
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from threading import Lock, local
+from user_login_panel.utils.session_record import SessionRecord
+from user_login_panel.utils.session_store import SessionStore
+
+class SQLiteSessionStore(SessionStore):
+    """Armazenamento de sessões em um arquivo SQLite (modo WAL), compartilhável entre réplicas.
+
+    Os registros de sessão são serializados em JSON. Os últimos acessos são acumulados em
+    memória e gravados em lote; a expiração é feita por TTL diretamente no banco.
+    """
+
+    def __init__(self, path: str, timeout: float, flush_interval: float = 5.0,
+                 flush_size: int = 256, cleanup_interval: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        # Intervalo máximo e tamanho máximo do lote de últimos acessos pendentes
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        # Intervalo mínimo entre duas limpezas por TTL
+        self.cleanup_interval = cleanup_interval
+        self._local = local()
+        self._pending: Dict[str, float] = {}
+        self._pending_lock = Lock()
+        self._last_flush = time.time()
+        self._last_cleanup = 0.0
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_last_access ON sessions (last_access)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            " key TEXT PRIMARY KEY,"
+            " state TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual (uma por thread)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _load(self, session_id: str, now: float, conn: Optional[sqlite3.Connection] = None) -> Optional[SessionRecord]:
+        row = (conn or self._connection()).execute(
+            "SELECT data, last_access FROM sessions WHERE session_id = ? AND last_access >= ?",
+            (session_id, now - self.timeout)
+        ).fetchone()
+        if row is None:
+            return None
+        record = SessionRecord.from_dict(json.loads(row[0]))
+        record.last_access = row[1]
+        return record
+
+    def get(self, session_id: str, key: str, default: Any = None) -> Any:
+        record = self._load(session_id, time.time())
+        if record is None:
+            return default
+        return record.get(key, default)
+
+    def get_record(self, session_id: str) -> Optional[SessionRecord]:
+        return self._load(session_id, time.time())
+
+    def contains(self, session_id: str) -> bool:
+        return self._load(session_id, time.time()) is not None
+
+    def ensure(self, session_id: str, now: float) -> None:
+        conn = self._connection()
+        # Verificação só de leitura: o lock de escrita (compartilhado pelas réplicas) só é tomado se a sessão faltar
+        if conn.execute(
+            "SELECT 1 FROM sessions WHERE session_id = ? AND last_access >= ?",
+            (session_id, now - self.timeout)
+        ).fetchone() is not None:
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Sessão vencida que ainda não foi limpa é reiniciada
+            conn.execute(
+                "DELETE FROM sessions WHERE session_id = ? AND last_access < ?",
+                (session_id, now - self.timeout)
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, data, last_access) VALUES (?, ?, ?)",
+                (session_id, json.dumps(SessionRecord(now).to_dict()), now)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def touch(self, session_id: str, now: float) -> None:
+        """Acumula o último acesso; a gravação ocorre em lote."""
+        with self._pending_lock:
+            self._pending[session_id] = now
+            due = len(self._pending) >= self.flush_size or now - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Grava no banco os últimos acessos pendentes."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.time()
+        if not pending:
+            return
+        self._connection().executemany(
+            "UPDATE sessions SET last_access = MAX(last_access, ?) WHERE session_id = ?",
+            [(last_access, session_id) for session_id, last_access in pending.items()]
+        )
+
+    def _pop_pending(self, session_id: str, now: float) -> float:
+        with self._pending_lock:
+            return max(self._pending.pop(session_id, now), now)
+
+    def set(self, session_id: str, key: str, value: Any, now: float) -> None:
+        self.update(session_id, {key: value}, now)
+
+    def update(self, session_id: str, values: Dict[str, Any], now: float) -> None:
+        last_access = self._pop_pending(session_id, now)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            record = self._load(session_id, now, conn) or SessionRecord(now)
+            for key, value in values.items():
+                record.set(key, value)
+            record.last_access = last_access
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, last_access) VALUES (?, ?, ?)",
+                (session_id, json.dumps(record.to_dict()), last_access)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self, session_id: str, now: float) -> None:
+        last_access = self._pop_pending(session_id, now)
+        self._connection().execute(
+            "UPDATE sessions SET data = ?, last_access = ? WHERE session_id = ?",
+            (json.dumps(SessionRecord(now).to_dict()), last_access, session_id)
+        )
+
+    def cleanup(self, now: float) -> int:
+        """Remove as sessões vencidas (no máximo uma vez a cada cleanup_interval)."""
+        if now - self._last_cleanup < self.cleanup_interval:
+            return 0
+        self._last_cleanup = now
+        self.flush()
+        conn = self._connection()
+        cursor = conn.execute(
+            "DELETE FROM sessions WHERE last_access < ?", (now - self.timeout,)
+        )
+        conn.execute("DELETE FROM rate_limits WHERE expires_at < ?", (now,))
+        return cursor.rowcount
+
+    def get_limit_state(self, key: str) -> Optional[List[float]]:
+        row = self._connection().execute(
+            "SELECT state FROM rate_limits WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_limit_state(self, key: str, state: List[float], ttl: float) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO rate_limits (key, state, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(state), time.time() + ttl)
+        )
+
+    @contextmanager
+    def limit_transaction(self) -> Iterator[None]:
+        # Lock de escrita desde a leitura: duas réplicas não gastam o mesmo token
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def limit_state_count(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM rate_limits WHERE expires_at >= ?", (time.time(),)
+        ).fetchone()[0]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT session_id, data FROM sessions WHERE last_access >= ?",
+            (time.time() - self.timeout,)
+        ).fetchall()
+        return {session_id: json.loads(data) for session_id, data in rows}
+
+    def count(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE last_access >= ?",
+            (time.time() - self.timeout,)
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        self.flush()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,60 @@
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, TextIO
+
+# Colunas de usuário aceitas na importação e geradas na exportação
+USER_FIELDS = ["email", "name", "enterprise", "position", "permission", "exception", "autorization", "password"]
+# Chave da linha lida que não pôde ser interpretada: a importação a registra como erro e segue adiante
+ROW_ERROR = "_error"
+
+def chunked(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Divide um iterável em listas de até `size` itens, sem materializá-lo por inteiro."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def read_users(stream: TextIO, fmt: str = "csv") -> Iterator[Dict[str, Any]]:
+    """
+    Lê usuários de um arquivo CSV (com cabeçalho) ou JSONL, linha a linha.
+    Linhas JSONL inválidas ou que não são objetos viram {ROW_ERROR: mensagem}, sem interromper a leitura.
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield row
+    elif fmt == "jsonl":
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield {ROW_ERROR: f"JSON inválido: {exc}"}
+                continue
+            yield row if isinstance(row, dict) else {ROW_ERROR: "A linha não é um objeto JSON"}
+    else:
+        raise ValueError(f"Formato desconhecido: {fmt}")
+
+def write_users(stream: TextIO, rows: Iterable[Dict[str, Any]], fmt: str = "csv", fields: List[str] = None) -> int:
+    """Grava usuários em CSV ou JSONL à medida que são produzidos; retorna o total gravado."""
+    fields = fields or USER_FIELDS
+    total = 0
+
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            total += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            stream.write(json.dumps({field: row.get(field) for field in fields}, ensure_ascii=False) + "\n")
+            total += 1
+    else:
+        raise ValueError(f"Formato desconhecido: {fmt}")
+
+    return total
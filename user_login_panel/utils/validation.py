@@ -0,0 +1,7 @@
+import re
+
+# Validações leves usadas pelos formulários, sem depender do ORM nem dos drivers do banco
+EMAIL_REGEX = re.compile(r'^\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+def is_valid_email(email):
+    return EMAIL_REGEX.match(email)
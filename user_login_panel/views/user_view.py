@@ -1,19 +1,16 @@
 import streamlit as st
 from datetime import datetime
+from user_login_panel.utils.metrics import Metrics
 from user_login_panel.utils.session_manager import SessionManager
 
 class UserViewHelper:
-    def __init__(self):
-        # Verifica se a chave 'current_page' existe no session_state, caso contrário, cria.
-        if "current_page" not in st.session_state:
-            st.session_state.current_page = "login"
-    
-    def set_logo(self, image_path):
+    @Metrics.timed("view_set_logo_seconds")
+    def set_logo(self, image):
         """
         Define o logotipo no aplicativo Streamlit.
-        :param image_path: Caminho da imagem do logotipo.
+        :param image: Caminho ou conteúdo (bytes) da imagem do logotipo.
         """
-        st.image(image_path)
+        st.image(image)
     
     def set_title(self, title):
         """
@@ -39,29 +36,30 @@ class UserViewHelper:
 
     def set_page(self, page, refresh=False):
         """
-        Define a página atual no session_state.
+        Define a página atual no registro da sessão.
         :param page: O nome ou identificador da página.
         """
-        st.session_state.current_page = page
         SessionManager.set_session_state("current_page", page)
         
         if refresh:
             st.rerun()  # Atualiza a página
 
     def get_page(self):
-        return st.session_state.current_page
+        return SessionManager.get_session_state("current_page", "login")
 
 class UserViewRegisterAndLogin:
     def login_page(self):
         st.subheader("Login ou Cadastro")
         return st.tabs(["Login", "Cadastrar"])
 
+    @Metrics.timed("view_login_form_seconds")
     def login_form(self):
         session_id = SessionManager.get_session_id()
         email = st.text_input("Email", key=f"{session_id}_login_user")
         password = st.text_input("Senha", type="password", key=f"{session_id}_login_pass")
         return email, password
 
+    @Metrics.timed("view_register_form_seconds")
     def register_form(self):
         session_id = SessionManager.get_session_id()
         new_email = st.text_input("Novo Email", key=f"{session_id}_register_user")
@@ -102,23 +100,21 @@ class UserViewRegisterAndLogin:
         return register_button, update_button, delete_button
 
 class UserViewSidebar:
-    _users: dict = {}
-    
     def __init__(self):
         self.sidebar = st.sidebar
         self.search_button = None
+        self.refresh_button = None
         self.logout_button = None
         self.start_date = None
         self.end_date = None
 
     def set_user(self, user):
-        session_id = SessionManager.get_session_id()
-        self._users[session_id] = user
+        SessionManager.set_session_state("user", user)
     
     def get_user(self):
-        session_id = SessionManager.get_session_id()
-        return self._users.get(session_id)
+        return SessionManager.get_session_state("user")
     
+    @Metrics.timed("view_display_seconds")
     def display(self):
         with self.sidebar:
             self.sidebar.subheader(f"Bem-vindo, {self.get_user()}!")
@@ -131,23 +127,36 @@ class UserViewSidebar:
             with col2:
                 self.logout_button = st.button("Logout", key=f"{SessionManager.get_session_id()}_logout_button", use_container_width=True)
 
-            self.start_date = self.sidebar.date_input(
-                "Data Inicial",
-                value=datetime.now(),
-                min_value=datetime(2024, 1, 1),
-                max_value=datetime(2050, 12, 31),
-                format="DD/MM/YYYY",
-                key=f"{SessionManager.get_session_id()}_start_date"
-            )
-
-            self.end_date = self.sidebar.date_input(
-                "Data Final",
-                value=datetime.now(),
-                min_value=self.start_date,
-                max_value=datetime(2030, 12, 31),
-                format="DD/MM/YYYY",
-                key=f"{SessionManager.get_session_id()}_end_date"
-            )
+            self.date_range()
+
+    @st.fragment
+    @Metrics.timed("fragment_date_range_seconds")
+    def date_range(self):
+        """
+        Seletor do período (chamado dentro da barra lateral). É um fragmento: trocar uma data
+        reexecuta apenas este trecho, sem o restante do script; os dados da página principal
+        usam o novo período na próxima execução completa (ex.: botão Atualizar).
+        """
+        self.start_date = st.date_input(
+            "Data Inicial",
+            value=datetime.now(),
+            min_value=datetime(2024, 1, 1),
+            max_value=datetime(2050, 12, 31),
+            format="DD/MM/YYYY",
+            key=f"{SessionManager.get_session_id()}_start_date"
+        )
+
+        self.end_date = st.date_input(
+            "Data Final",
+            value=datetime.now(),
+            min_value=self.start_date,
+            max_value=datetime(2030, 12, 31),
+            format="DD/MM/YYYY",
+            key=f"{SessionManager.get_session_id()}_end_date"
+        )
+
+        st.write(f"Data Inicial: {self.start_date}")
+        st.write(f"Data Final: {self.end_date}")
     
     def get_sidebar(self):
         return self.sidebar
@@ -162,4 +171,79 @@ class UserViewSidebar:
         return self.start_date
     
     def get_end_date(self):
-        return self.end_date
\ No newline at end of file
+        return self.end_date
+
+class UserViewMetrics:
+    def display(self, snapshot, prometheus_text):
+        """
+        Exibe as métricas de desempenho (página restrita a administradores).
+        :param snapshot: Histogramas, contadores e medidas instantâneas (Metrics.snapshot()).
+        :param prometheus_text: As mesmas métricas no formato de texto do Prometheus.
+        """
+        st.subheader("Métricas")
+
+        st.dataframe(
+            [
+                {"métrica": name, "chamadas": data["count"], "total (s)": round(data["sum"], 6),
+                 "p50 (s)": data["p50"], "p95 (s)": data["p95"], "p99 (s)": data["p99"]}
+                for name, data in snapshot["histograms"].items()
+            ],
+            use_container_width=True
+        )
+        st.dataframe(
+            [{"métrica": name, "valor": value} for name, value in sorted({**snapshot["counters"], **snapshot["gauges"]}.items())],
+            use_container_width=True
+        )
+
+        with st.expander("Formato Prometheus"):
+            st.code(prometheus_text, language="text")
+
+class UserViewDirectory:
+    # Rótulos dos filtros exatos do diretório
+    FILTER_LABELS = {"enterprise": "Empresa", "position": "Cargo", "permission": "Permissão"}
+
+    def filters(self, options):
+        """
+        Exibe a busca e os filtros do diretório de usuários.
+        :param options: Valores disponíveis para cada filtro (UserModel.get_directory_options()).
+        :return: Dicionário com a busca por prefixo e os filtros selecionados.
+        """
+        session_id = SessionManager.get_session_id()
+        st.subheader("Diretório de usuários")
+        columns = st.columns(len(self.FILTER_LABELS) + 1)
+
+        with columns[0]:
+            selected = {"search": st.text_input("Buscar por nome ou e-mail", key=f"{session_id}_directory_search")}
+
+        for column, (field, label) in zip(columns[1:], self.FILTER_LABELS.items()):
+            with column:
+                selected[field] = st.selectbox(
+                    label, [""] + options.get(field, []), format_func=lambda value: value or "Todos",
+                    key=f"{session_id}_directory_{field}"
+                )
+
+        return selected
+
+    @Metrics.timed("view_directory_display_seconds")
+    def display(self, users, page, has_previous, has_next):
+        """
+        Exibe uma página do diretório e os botões de navegação.
+        :param users: Usuários da página atual.
+        :param page: Número da página atual (a partir de 1).
+        :return: Tupla (anterior clicado, próxima clicado).
+        """
+        session_id = SessionManager.get_session_id()
+        st.dataframe(users, use_container_width=True)
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            previous_button = st.button("Anterior", key=f"{session_id}_directory_previous", disabled=not has_previous, use_container_width=True)
+
+        with col2:
+            st.write(f"Página {page}")
+
+        with col3:
+            next_button = st.button("Próxima", key=f"{session_id}_directory_next", disabled=not has_next, use_container_width=True)
+
+        return previous_button, next_button